@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+BENCHMARK_CACHE_PREFIX = 'benchmark'
+
+
+class Rollback(Exception):
+    """Откатывает синтетические данные после замеров."""
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+@contextmanager
+def rolled_back():
+    """Выполняет блок в транзакции и откатывает все его изменения."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def get_benchmark_caches():
+    """Те же кэши, но с отдельным префиксом ключей.
+
+    Замеры меняют версии наборов данных и кладут в кэш ответы с
+    синтетическими данными: с общим префиксом это сбросило бы кэш
+    работающего сайта и показало бы ему откаченные строки.
+    """
+    return {
+        alias: {
+            **config,
+            'KEY_PREFIX': config.get('KEY_PREFIX', '') + BENCHMARK_CACHE_PREFIX
+        }
+        for alias, config in settings.CACHES.items()
+    }
+
+
+class BenchmarkCommand(BaseCommand):
+    """Нагрузочный тест на синтетических данных в базе по умолчанию.
+
+    Данные вставляются в транзакции и откатываются, но пока идет замер,
+    вставки держат блокировки и раздувают журнал. Поэтому без DEBUG
+    команда запускается только с флагом --i-know. Кэш используется с
+    отдельным префиксом ключей.
+    """
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument(
+            '--i-know',
+            action='store_true',
+            help='Запустить без DEBUG, понимая, что данные пишутся в базу'
+        )
+        return parser
+
+    def execute(self, *args, **options):
+        if not settings.DEBUG and not options.get('i_know'):
+            raise CommandError(
+                'Команда пишет синтетические данные в базу '
+                f'{settings.DATABASES["default"]["NAME"]}. Запустите ее '
+                'с DEBUG=True или добавьте --i-know.'
+            )
+        with override_settings(CACHES=get_benchmark_caches()):
+            return super().execute(*args, **options)
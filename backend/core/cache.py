@@ -0,0 +1,75 @@
+import hashlib
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.core.cache import cache
+
+
+def get_version_key(name):
+    return f'version:{name}'
+
+
+def get_version(name):
+    """Возвращает текущую версию именованного набора данных в кэше."""
+    key = get_version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(*names):
+    """Возвращает словарь {имя: версия} одним обращением к кэшу."""
+    keys = {get_version_key(name): name for name in names}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    for name in names:
+        if name not in versions:
+            versions[name] = get_version(name)
+    return versions
+
+
+def bump_version(*names):
+    """Меняет версии наборов данных, делая устаревшими ключи с ними."""
+    if names:
+        cache.set_many(
+            {get_version_key(name): uuid4().hex for name in names},
+            None
+        )
+
+
+def stream_with_cache(key, chunks, timeout, max_size):
+    """Отдает chunks и сохраняет их в кэш, если размер не больше max_size."""
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if size <= max_size:
+            parts.append(chunk)
+        yield chunk
+    if size <= max_size:
+        cache.set(key, b''.join(parts), timeout)
+
+
+def get_query_hash(query_params):
+    """Хэш параметров запроса, не зависящий от их порядка."""
+    query = urlencode(sorted(
+        (name, sorted(values)) for name, values in query_params.lists()
+    ), doseq=True)
+    return hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_cached_content(key, build, timeout):
+    """Возвращает пару (etag, content) из кэша или строит ее через build()."""
+    cached = cache.get(key)
+    if cached is None:
+        content = build()
+        etag = hashlib.md5(content, usedforsecurity=False).hexdigest()
+        cached = (f'"{etag}"', content)
+        cache.set(key, cached, timeout)
+    return cached
@@ -23,3 +23,41 @@ MAX_LENGTH_FIRST_AND_LAST_NAME = 150
 NON_VALID_USERNAME = 'me'
 MIN_COOK_TIME = 1
 MAX_COOK_TIME = 1440
+PDF_FONT_NAME = 'Stamps'
+SPOOL_MAX_SIZE = 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+SHOPPING_CART_CACHE_TIMEOUT = 60 * 60 * 24
+SHOPPING_CART_CACHE_MAX_SIZE = 5 * 1024 * 1024
+SHOPPING_LIST_JOB_TIMEOUT = 10 * 60
+SHOPPING_LIST_JOB_TTL = 60 * 60 * 24
+INGREDIENT_SEARCH_LIMIT = 50
+REFERENCE_CACHE_TIMEOUT = 60 * 60 * 24
+RANKING_FAVORITE_WEIGHT = 1.0
+RANKING_CART_WEIGHT = 2.0
+RANKING_HALF_LIFE_DAYS = 7
+RANKING_EPOCH = '2024-01-01T00:00:00+00:00'
+RANKING_BATCH_SIZE = 1000
+RANKING_REFRESH_OVERLAP_MINUTES = 10
+FEED_FANOUT_LIMIT = 10000
+FEED_BATCH_SIZE = 1000
+IMAGE_VARIANTS = {
+    'thumbnail': (160, 160),
+    'card': (480, 480),
+    'full': (1280, 1280),
+}
+IMAGE_VARIANT_FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+IMAGE_QUALITY = 85
+BASE64_CHUNK_SIZE = 64 * 1024
+BASE64_WHITESPACE = ' \t\r\n'
+IMAGE_FIELDS = (
+    ('recipes', 'Recipe', 'image'),
+    ('users', 'User', 'avatar'),
+)
+IMAGE_RELEASE_GRACE_MINUTES = 60
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+SLOW_REQUEST_MAX_QUERIES = 20
+RECIPE_IMPORT_BATCH_SIZE = 100
+SYNC_MAX_OPERATIONS = 500
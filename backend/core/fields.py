@@ -1,14 +1,53 @@
-import base64
-
-from django.core.files.base import ContentFile
+from django.core.exceptions import ValidationError
 from rest_framework import serializers
 
+from core.images import decode_base64_image, get_variant_urls, reencode_image
+
 
 class Base64ImageField(serializers.ImageField):
     """Сериализатор фотографий."""
     def to_internal_value(self, data):
-        if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+        try:
+            if isinstance(data, str) and data.startswith('data:image'):
+                data = decode_base64_image(data)
+            if hasattr(data, 'read'):
+                with data:
+                    data = reencode_image(data, data.name)
+        except ValidationError as error:
+            raise serializers.ValidationError(error.messages)
         return super().to_internal_value(data)
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Ссылки на уменьшенные копии изображения или на оригинал."""
+    def to_representation(self, value):
+        if not value:
+            return None
+        return get_variant_urls(value, self.context.get('request'))
+
+
+class ReferenceListField(serializers.ListField):
+    """Список id, разрешаемый в объекты через ReferenceIndex.
+
+    В отличие от PrimaryKeyRelatedField(many=True) не делает запрос
+    на каждый id.
+    """
+    default_error_messages = {
+        'does_not_exist': 'Недопустимый первичный ключ "{pk_value}" - '
+                          'объект не существует.',
+    }
+
+    def __init__(self, index, **kwargs):
+        self.index = index
+        kwargs.setdefault('child', serializers.IntegerField())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        ids = super().to_internal_value(data)
+        found, missing = self.index.resolve(ids)
+        if missing:
+            self.fail('does_not_exist', pk_value=min(missing))
+        return [found[pk] for pk in ids]
+
+    def to_representation(self, value):
+        return [obj.pk for obj in value.all()]
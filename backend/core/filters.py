@@ -1,7 +1,11 @@
-from django_filters.rest_framework import BooleanFilter, CharFilter, FilterSet
+from django.db.models import Exists, F, OuterRef
+from django_filters.rest_framework import (BooleanFilter, CharFilter,
+                                           ChoiceFilter, FilterSet)
 
 from ingredients.models import Ingredient
+from ingredients.search import search_ingredients
 from recipes.models import Recipe
+from tags.utils import get_tag_ids
 
 
 class IngredientFilter(FilterSet):
@@ -15,7 +19,7 @@ class IngredientFilter(FilterSet):
     def filter_name(self, queryset, name, value):
         """Кастомный фильтр для поиска по имени ингредиента."""
         if value:
-            return queryset.filter(name__icontains=value)
+            return search_ingredients(queryset, value)
         return queryset
 
 
@@ -24,6 +28,13 @@ class RecipeFilter(FilterSet):
     tags = CharFilter(method='filter_tags')
     is_favorited = BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = BooleanFilter(method='filter_is_in_shopping_cart')
+    ordering = ChoiceFilter(
+        method='filter_ordering',
+        choices=(
+            ('popular', 'popular'),
+            ('trending', 'trending'),
+        )
+    )
 
     class Meta:
         model = Recipe
@@ -32,13 +43,17 @@ class RecipeFilter(FilterSet):
     def filter_tags(self, queryset, name, value):
         """Фильтрует рецепты по тегам, переданным в запросе."""
         tags = self.request.query_params.getlist('tags')
-        if tags:
-            queryset = queryset.filter(
-                tags__name__in=tags
-            ).distinct() | queryset.filter(
-                tags__slug__in=tags
-            ).distinct()
-        return queryset
+        if not tags:
+            return queryset
+        tag_ids = get_tag_ids(tags)
+        if not tag_ids:
+            return queryset.none()
+        return queryset.filter(Exists(
+            Recipe.tags.through.objects.filter(
+                recipe_id=OuterRef('pk'),
+                tag_id__in=tag_ids
+            )
+        ))
 
     def filter_is_favorited(self, queryset, name, value):
         """Фильтрация по параметру is_favorited."""
@@ -51,3 +66,13 @@ class RecipeFilter(FilterSet):
         if value and self.request.user.is_authenticated:
             return queryset.filter(shopping_cart__user=self.request.user)
         return queryset
+
+    def filter_ordering(self, queryset, name, value):
+        """Сортировка по предрассчитанному рейтингу рецептов."""
+        if value:
+            return queryset.order_by(
+                F(f'rank__{value}_score').desc(nulls_last=True),
+                '-created_at',
+                '-id'
+            )
+        return queryset
@@ -0,0 +1,279 @@
+import base64
+import binascii
+import io
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageFile, ImageOps, UnidentifiedImageError
+
+from core.constants import (BASE64_CHUNK_SIZE, BASE64_WHITESPACE, IMAGE_FIELDS,
+                            IMAGE_QUALITY, IMAGE_RELEASE_GRACE_MINUTES,
+                            IMAGE_VARIANT_FORMATS, IMAGE_VARIANTS,
+                            SPOOL_MAX_SIZE)
+from core.workers import run_in_background
+
+logger = logging.getLogger(__name__)
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': IMAGE_QUALITY, 'optimize': True},
+    'WEBP': {'quality': IMAGE_QUALITY, 'method': 4},
+    'PNG': {'optimize': True},
+}
+
+
+def to_rgb(image):
+    """Переводит изображение в RGB, накладывая прозрачность на белый фон."""
+    if image.mode == 'RGB':
+        return image
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def save_image(image, format):
+    if format == 'JPEG':
+        image = to_rgb(image)
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **SAVE_OPTIONS.get(format, {}))
+    return buffer.getvalue()
+
+
+def check_dimensions(size):
+    width, height = size
+    if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise ValidationError(
+            f'Изображение слишком большое: {width}x{height} пикселей.'
+        )
+
+
+def iter_base64(data, start):
+    """Декодирует base64 частями по BASE64_CHUNK_SIZE символов.
+
+    Пробелы и переводы строк (base64 с переносом по 76 символов)
+    выбрасываются, а хвост части, не кратный 4 символам, переносится
+    в следующую, чтобы не сбить выравнивание.
+    """
+    tail = ''
+    for offset in range(start, len(data), BASE64_CHUNK_SIZE):
+        chunk = tail + ''.join(
+            data[offset:offset + BASE64_CHUNK_SIZE].split()
+        )
+        end = len(chunk) - len(chunk) % 4
+        tail = chunk[end:]
+        if end:
+            yield base64.b64decode(chunk[:end])
+    if tail:
+        raise binascii.Error('Incorrect padding')
+
+
+def decode_base64_image(data):
+    """Декодирует data URL по частям во временный файл.
+
+    Размер проверяется до декодирования, а размеры в пикселях - как
+    только декодирован заголовок изображения.
+    """
+    header, separator, _ = data[:100].partition(';base64,')
+    if not separator:
+        raise ValidationError('Некорректный формат изображения.')
+    start = len(header) + len(separator)
+    length = len(data) - start
+    if length // 4 * 3 > settings.IMAGE_UPLOAD_MAX_SIZE:
+        # Переносы строк не занимают места после декодирования.
+        length -= sum(
+            data.count(char, start)
+            for char in BASE64_WHITESPACE if char in data
+        )
+    if length // 4 * 3 > settings.IMAGE_UPLOAD_MAX_SIZE:
+        raise ValidationError(
+            'Размер изображения не должен превышать '
+            f'{settings.IMAGE_UPLOAD_MAX_SIZE // (1024 * 1024)} МБ.'
+        )
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    parser = ImageFile.Parser()
+    try:
+        for chunk in iter_base64(data, start):
+            output.write(chunk)
+            if parser is not None:
+                parser.feed(chunk)
+                if parser.image is not None:
+                    check_dimensions(parser.image.size)
+                    parser = None
+    except (binascii.Error, OSError):
+        output.close()
+        raise ValidationError('Загрузите корректное изображение.')
+    except ValidationError:
+        output.close()
+        raise
+    output.seek(0)
+    return File(output, name='temp.' + header.split('/')[-1])
+
+
+def reencode_image(file, name):
+    """Проверяет загруженное изображение и пересохраняет его без метаданных."""
+    try:
+        with Image.open(file) as source:
+            format = source.format
+            check_dimensions(source.size)
+            source.load()
+            image = ImageOps.exif_transpose(source)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise ValidationError('Загрузите корректное изображение.')
+    image.info = {}
+    base, _ = os.path.splitext(name)
+    return ContentFile(
+        save_image(image, format),
+        name=f'{base}.{format.lower()}'
+    )
+
+
+def get_variant_name(name, variant, extension):
+    base, _ = os.path.splitext(name)
+    return f'{base}_{variant}.{extension}'
+
+
+def get_variant_names(name):
+    return [
+        get_variant_name(name, variant, extension)
+        for variant in IMAGE_VARIANTS
+        for extension in IMAGE_VARIANT_FORMATS
+    ]
+
+
+def get_last_variant_name(name):
+    """Копия, которую generate_variants сохраняет последней."""
+    return get_variant_name(
+        name,
+        list(IMAGE_VARIANTS)[-1],
+        list(IMAGE_VARIANT_FORMATS)[-1]
+    )
+
+
+def get_variant_urls(file, request=None):
+    """Ссылки на уменьшенные копии изображения во всех форматах.
+
+    Пока копии не созданы, все ссылки ведут на оригинал.
+    """
+    ready = file.storage.exists(get_last_variant_name(file.name))
+    urls = {}
+    for variant in IMAGE_VARIANTS:
+        urls[variant] = {}
+        for extension in IMAGE_VARIANT_FORMATS:
+            url = file.storage.url(
+                get_variant_name(file.name, variant, extension)
+                if ready else file.name
+            )
+            urls[variant][extension] = (
+                request.build_absolute_uri(url) if request else url
+            )
+    return urls
+
+
+def generate_variants(name):
+    """Создает уменьшенные копии изображения, если их еще нет.
+
+    Возвращает True, если копии были созданы.
+    """
+    if default_storage.exists(get_last_variant_name(name)):
+        return False
+    try:
+        with default_storage.open(name) as file, Image.open(file) as source:
+            source.load()
+            image = ImageOps.exif_transpose(source)
+    except (FileNotFoundError, UnidentifiedImageError, OSError):
+        logger.warning('Не удалось открыть изображение %s', name)
+        return False
+    image.info = {}
+    for variant, size in IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.LANCZOS)
+        for extension, format in IMAGE_VARIANT_FORMATS.items():
+            variant_name = get_variant_name(name, variant, extension)
+            if default_storage.exists(variant_name):
+                default_storage.delete(variant_name)
+            default_storage.save(
+                variant_name,
+                ContentFile(save_image(resized, format))
+            )
+    return True
+
+
+def schedule_variants(file):
+    """Ставит генерацию копий в фоновый пул после фиксации транзакции."""
+    if file:
+        name = file.name
+        transaction.on_commit(
+            lambda: run_in_background(generate_variants, name)
+        )
+
+
+def count_references(name):
+    """Количество объектов, ссылающихся на файл изображения."""
+    return sum(
+        apps.get_model(app_label, model_name).objects.filter(
+            **{field_name: name}
+        ).count()
+        for app_label, model_name, field_name in IMAGE_FIELDS
+    )
+
+
+def delete_image(name):
+    """Удаляет файл изображения вместе с его копиями."""
+    for file_name in (name, *get_variant_names(name)):
+        default_storage.delete(file_name)
+
+
+def is_recently_modified(name):
+    """Файл изменен или загружен повторно в пределах окна ожидания."""
+    threshold = timezone.now() - timedelta(
+        minutes=IMAGE_RELEASE_GRACE_MINUTES
+    )
+    try:
+        return default_storage.get_modified_time(name) > threshold
+    except FileNotFoundError:
+        return False
+
+
+def release_image(name):
+    """Удаляет изображение, если на него больше никто не ссылается.
+
+    Недавно загруженный файл может принадлежать еще не зафиксированной
+    транзакции, поэтому его оставляют команде gc_media.
+    """
+    if not name or is_recently_modified(name) or count_references(name):
+        return
+    delete_image(name)
+
+
+def schedule_release(name):
+    if name:
+        transaction.on_commit(lambda: release_image(name))
+
+
+def remember_image(instance, field_name):
+    """Запоминает имя файла, с которым объект был загружен из базы."""
+    if field_name in instance.get_deferred_fields():
+        return
+    instance._original_images = getattr(instance, '_original_images', {})
+    instance._original_images[field_name] = getattr(
+        instance, field_name
+    ).name or ''
+
+
+def release_replaced_image(instance, field_name):
+    """Освобождает прежний файл, если у объекта сменилось изображение."""
+    original = getattr(instance, '_original_images', {}).get(field_name)
+    current = getattr(instance, field_name).name or ''
+    if original and original != current:
+        schedule_release(original)
+    remember_image(instance, field_name)
@@ -0,0 +1,95 @@
+import base64
+import io
+import math
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from PIL import Image
+
+from core.images import decode_base64_image
+
+
+def make_data_url(size):
+    """PNG из шума примерно size байт: шум почти не сжимается."""
+    side = math.isqrt(size)
+    buffer = io.BytesIO()
+    Image.effect_noise((side, side), 64).save(buffer, format='PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f'data:image/png;base64,{encoded}'
+
+
+def decode_whole(data):
+    """Прежний Base64ImageField: split и b64decode всей строки."""
+    format, imgstr = data.split(';base64,')
+    return ContentFile(
+        base64.b64decode(imgstr), name='temp.' + format.split('/')[-1]
+    )
+
+
+def decode_stream(data):
+    return decode_base64_image(data)
+
+
+MODES = {'целиком': decode_whole, 'по частям': decode_stream}
+
+
+class Command(BaseCommand):
+    help = (
+        'Пиковая память и время декодирования base64-изображения: '
+        'b64decode всей строки против decode_base64_image.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[5, 20, 30],
+            help='Размеры изображений в МБ'
+        )
+
+    def run(self, decode, data):
+        try:
+            with decode(data):
+                pass
+        except ValidationError as error:
+            return error.messages[0]
+        return 'принято'
+
+    def measure(self, decode, data):
+        """Время без tracemalloc, затем пик памяти вторым прогоном."""
+        start = time.perf_counter()
+        result = self.run(decode, data)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        self.run(decode, data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak, elapsed, result
+
+    def report(self, label, peak, elapsed, result):
+        self.stdout.write(
+            f'  {label:<22} пик {peak / 2 ** 20:7.1f} МБ  '
+            f'{elapsed * 1000:7.0f} мс  {result}'
+        )
+
+    def handle(self, *args, **options):
+        limit = settings.IMAGE_UPLOAD_MAX_SIZE
+        for megabytes in options['sizes']:
+            data = make_data_url(megabytes * 2 ** 20)
+            self.stdout.write(
+                f'{megabytes} МБ: строка data URL '
+                f'{len(data) / 2 ** 20:.1f} МБ'
+            )
+            with override_settings(IMAGE_UPLOAD_MAX_SIZE=len(data)):
+                for label, decode in MODES.items():
+                    self.report(label, *self.measure(decode, data))
+            self.report(
+                f'лимит {limit // 2 ** 20} МБ',
+                *self.measure(decode_stream, data)
+            )
@@ -0,0 +1,112 @@
+import io
+import time
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
+
+from core.constants import IMAGE_VARIANT_FORMATS, IMAGE_VARIANTS
+from core.images import reencode_image, save_image
+
+SYNTHETIC_SIZES = ((1280, 960), (3024, 4032), (4000, 3000))
+PAGE_SIZE = 6
+
+
+def make_photo(size, seed):
+    """Синтетическое «фото»: градиент, фигуры и шум, JPEG с телефона."""
+    width, height = size
+    image = Image.linear_gradient('L').resize(size).convert('RGB')
+    image = ImageOps.colorize(
+        image.convert('L'), (40 + seed * 30, 20, 10), (250, 220, 160)
+    )
+    draw = ImageDraw.Draw(image)
+    for number in range(40):
+        x = (number * 7919 + seed * 104729) % width
+        y = (number * 6007 + seed * 1299709) % height
+        radius = min(size) // (6 + number % 10)
+        draw.ellipse(
+            (x - radius, y - radius, x + radius, y + radius),
+            fill=((number * 37) % 256, (number * 91) % 256, (seed * 53) % 256)
+        )
+    image = image.filter(ImageFilter.GaussianBlur(3))
+    noise = Image.effect_noise(size, 24).convert('RGB')
+    image = Image.blend(image, noise, 0.08)
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=95)
+    return buffer.getvalue()
+
+
+def kilobytes(size):
+    return f'{size / 1024:8.1f} КБ'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает объем ответа с оригиналами изображений и с '
+        'уменьшенными копиями, которые отдает image_variants.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='Изображения; без них используются синтетические фото'
+        )
+
+    def get_sources(self, paths):
+        if not paths:
+            return [
+                (f'синтетическое {width}x{height}', make_photo(size, seed))
+                for seed, size in enumerate(SYNTHETIC_SIZES)
+                for width, height in (size,)
+            ]
+        sources = []
+        for path in map(Path, paths):
+            if not path.exists():
+                raise CommandError(f'Файл {path} не найден.')
+            sources.append((path.name, path.read_bytes()))
+        return sources
+
+    def measure(self, label, data):
+        """Размеры оригинала после загрузки и каждой копии."""
+        original = reencode_image(ContentFile(data), 'upload.jpg').read()
+        sizes = {'original': len(original)}
+        start = time.perf_counter()
+        with Image.open(io.BytesIO(original)) as source:
+            source.load()
+            image = ImageOps.exif_transpose(source)
+            for variant, size in IMAGE_VARIANTS.items():
+                resized = image.copy()
+                resized.thumbnail(size, Image.LANCZOS)
+                for extension, format in IMAGE_VARIANT_FORMATS.items():
+                    sizes[f'{variant}.{extension}'] = len(
+                        save_image(resized, format)
+                    )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{label}: {image.width}x{image.height}, '
+            f'копии за {elapsed * 1000:.0f} мс'
+        )
+        for name, size in sizes.items():
+            self.stdout.write(
+                f'  {name:<16} {kilobytes(size)}  '
+                f'{size / sizes["original"]:6.1%}'
+            )
+        return sizes
+
+    def handle(self, *args, **options):
+        results = [
+            self.measure(label, data)
+            for label, data in self.get_sources(options['paths'])
+        ]
+        self.stdout.write(
+            f'Страница списка из {PAGE_SIZE} карточек, по кругу '
+            'из изображений выше:'
+        )
+        for name in results[0]:
+            total = sum(
+                results[number % len(results)][name]
+                for number in range(PAGE_SIZE)
+            )
+            self.stdout.write(f'  {name:<16} {kilobytes(total)}')
@@ -0,0 +1,122 @@
+import time
+from itertools import cycle, islice
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.test import Client
+from rest_framework.mixins import ListModelMixin
+
+from core.benchmarks import BenchmarkCommand, percentile, rolled_back
+from core.cache import bump_version
+from core.constants import MAX_LENGTH
+from core.mixins import CachedListMixin
+from ingredients.management.commands.load_ingredients import read_csv
+from ingredients.models import Ingredient
+from tags.models import Tag
+
+TAGS = (('Завтрак', 'breakfast'), ('Обед', 'lunch'), ('Ужин', 'dinner'))
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Измеряет пропускную способность /api/tags/ и '
+        '/api/ingredients/?name= с кэшем, без него и с If-None-Match. '
+        'Данные добавляются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=str(
+                Path(settings.BASE_DIR).parent / 'data' / 'ingredients.csv'
+            ),
+            help='CSV с ингредиентами'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Количество запросов на каждый режим'
+        )
+
+    def make_urls(self, names, count):
+        """Ввод по буквам: префиксы длиной 1–3 реальных названий."""
+        prefixes = sorted({
+            name[:length].lower() for name in names for length in (1, 2, 3)
+        })
+        return [
+            f'/api/ingredients/?name={prefix}'
+            for prefix in islice(cycle(prefixes), count)
+        ]
+
+    def run(self, client, urls, conditional):
+        etags = {}
+        timings = []
+        started = time.perf_counter()
+        for url in urls:
+            headers = {}
+            if conditional and url in etags:
+                headers['HTTP_IF_NONE_MATCH'] = etags[url]
+            start = time.perf_counter()
+            response = client.get(url, **headers)
+            timings.append(time.perf_counter() - start)
+            if response.status_code not in (200, 304):
+                raise CommandError(
+                    f'{url} вернул {response.status_code}.'
+                )
+            etags[url] = response.get('ETag')
+        return time.perf_counter() - started, timings
+
+    def measure(self, name, urls):
+        client = Client()
+        modes = (
+            ('без кэша', False, False),
+            ('кэш', True, False),
+            ('кэш + 304', True, True),
+        )
+        self.stdout.write(f'{name}, запросов: {len(urls)}')
+        for mode, cached, conditional in modes:
+            bump_version('tags', 'ingredients')
+            if cached:
+                self.run(client, list(dict.fromkeys(urls)), False)
+                elapsed, timings = self.run(client, urls, conditional)
+            else:
+                with mock.patch.object(
+                    CachedListMixin, 'list', ListModelMixin.list
+                ):
+                    elapsed, timings = self.run(client, urls, conditional)
+            self.stdout.write(
+                f'  {mode:<10} {len(urls) / elapsed:8.0f} запр/с'
+                f'  p50 {percentile(timings, 0.5) * 1000:6.2f} мс'
+                f'  p99 {percentile(timings, 0.99) * 1000:6.2f} мс'
+            )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден.')
+        names = [
+            name.strip() for name, _ in read_csv(path)
+            if 0 < len(name.strip()) <= MAX_LENGTH
+        ]
+        count = options['requests']
+        self.stdout.write(
+            f'Кэш: {settings.CACHES["default"]["BACKEND"]}'
+        )
+        with rolled_back():
+            Tag.objects.bulk_create(
+                [Tag(name=name, slug=slug) for name, slug in TAGS],
+                ignore_conflicts=True
+            )
+            Ingredient.objects.bulk_create(
+                [Ingredient(name=name, measurement_unit='г')
+                 for name in names],
+                ignore_conflicts=True
+            )
+            self.measure('/api/tags/', ['/api/tags/'] * count)
+            self.measure(
+                '/api/ingredients/?name=', self.make_urls(names, count)
+            )
+        bump_version('tags', 'ingredients')
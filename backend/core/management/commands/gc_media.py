@@ -0,0 +1,67 @@
+import os
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.constants import IMAGE_FIELDS, IMAGE_RELEASE_GRACE_MINUTES
+from core.images import get_variant_names
+
+
+class Command(BaseCommand):
+    help = 'Удаляет изображения, на которые не ссылается ни один объект.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены'
+        )
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=IMAGE_RELEASE_GRACE_MINUTES,
+            help='Не трогать файлы моложе указанного числа минут'
+        )
+
+    def get_referenced(self):
+        referenced = set()
+        directories = set()
+        for app_label, model_name, field_name in IMAGE_FIELDS:
+            model = apps.get_model(app_label, model_name)
+            directories.add(model._meta.get_field(field_name).upload_to)
+            names = (
+                model.objects.exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True)
+                .iterator()
+            )
+            for name in names:
+                referenced.add(name)
+                referenced.update(get_variant_names(name))
+        return referenced, directories
+
+    def handle(self, *args, **options):
+        referenced, directories = self.get_referenced()
+        threshold = timezone.now() - timedelta(minutes=options['grace'])
+        removed = 0
+        for directory in sorted(directories):
+            if not default_storage.exists(directory):
+                continue
+            for file_name in default_storage.listdir(directory)[1]:
+                name = os.path.join(directory, file_name)
+                if (
+                    name in referenced
+                    or default_storage.get_modified_time(name) > threshold
+                ):
+                    continue
+                removed += 1
+                if options['dry_run']:
+                    self.stdout.write(name)
+                else:
+                    default_storage.delete(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Неиспользуемых файлов: {removed}'
+        ))
@@ -0,0 +1,36 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.constants import IMAGE_FIELDS
+from core.images import generate_variants
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает уменьшенные копии для уже загруженных изображений, '
+        'у которых их еще нет.'
+    )
+
+    def get_names(self):
+        names = set()
+        for app_label, model_name, field_name in IMAGE_FIELDS:
+            names.update(
+                apps.get_model(app_label, model_name).objects
+                .exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True)
+                .iterator()
+            )
+        return sorted(names)
+
+    def handle(self, *args, **options):
+        names = self.get_names()
+        created = 0
+        for number, name in enumerate(names, 1):
+            if generate_variants(name):
+                created += 1
+            if number % 100 == 0:
+                self.stdout.write(f'Обработано изображений: {number}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Изображений: {len(names)}, созданы копии: {created}'
+        ))
@@ -0,0 +1,70 @@
+import threading
+from collections import defaultdict
+
+METRICS = (
+    ('foodgram_requests_total', 'counter',
+     'Количество обработанных запросов', 'requests'),
+    ('foodgram_request_duration_seconds_total', 'counter',
+     'Суммарное время обработки запросов', 'duration'),
+    ('foodgram_request_duration_seconds_max', 'gauge',
+     'Максимальное время обработки запроса', 'max_duration'),
+    ('foodgram_db_queries_total', 'counter',
+     'Количество запросов к базе данных', 'queries'),
+    ('foodgram_db_duration_seconds_total', 'counter',
+     'Суммарное время запросов к базе данных', 'db_duration'),
+    ('foodgram_db_duplicate_queries_total', 'counter',
+     'Количество повторных одинаковых запросов к базе данных',
+     'duplicates'),
+    ('foodgram_response_bytes_total', 'counter',
+     'Суммарный размер ответов', 'response_bytes'),
+)
+
+
+class RequestMetrics:
+    """Накопленная в процессе статистика запросов по именам вьюх."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = defaultdict(lambda: defaultdict(float))
+
+    def record(self, view_name, method, duration, queries, db_duration,
+               duplicates, response_bytes):
+        with self.lock:
+            stats = self.stats[(view_name, method)]
+            stats['requests'] += 1
+            stats['duration'] += duration
+            stats['max_duration'] = max(stats['max_duration'], duration)
+            stats['queries'] += queries
+            stats['db_duration'] += db_duration
+            stats['duplicates'] += duplicates
+            stats['response_bytes'] += response_bytes
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+    def export(self):
+        """Статистика в текстовом формате Prometheus."""
+        with self.lock:
+            snapshot = {
+                labels: dict(stats) for labels, stats in self.stats.items()
+            }
+        lines = []
+        for name, metric_type, description, field in METRICS:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for (view_name, method), stats in sorted(snapshot.items()):
+                lines.append(
+                    f'{name}{{view="{escape_label(view_name)}",'
+                    f'method="{method}"}} {stats[field]!r}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,104 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from core.constants import SLOW_REQUEST_MAX_QUERIES
+from core.metrics import request_metrics
+
+logger = logging.getLogger('foodgram.slow_requests')
+
+
+class QueryCollector:
+    """Обертка execute_wrapper, запоминающая SQL и время запросов.
+
+    Параметры запросов не сохраняются: в них бывают пароли, токены и
+    персональные данные. Для поиска повторов хранится только их хэш.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                (sql, hash(repr(params)), time.perf_counter() - start)
+            )
+
+    @property
+    def duration(self):
+        return sum(duration for _, _, duration in self.queries)
+
+    @property
+    def duplicates(self):
+        return len(self.queries) - len(
+            {(sql, params_hash) for sql, params_hash, _ in self.queries}
+        )
+
+
+def get_response_size(response):
+    if response.has_header('Content-Length'):
+        return int(response['Content-Length'])
+    if getattr(response, 'streaming', False):
+        return 0
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """Собирает время, число и длительность SQL-запросов по вьюхам.
+
+    Включается настройкой REQUEST_METRICS. Запросы дольше
+    SLOW_REQUEST_THRESHOLD миллисекунд пишутся в лог вместе с текстом SQL
+    без параметров.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = QueryCollector()
+        start = time.perf_counter()
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        view_name = match.view_name if match else '<unresolved>'
+        request_metrics.record(
+            view_name,
+            request.method,
+            duration,
+            len(collector.queries),
+            collector.duration,
+            collector.duplicates,
+            get_response_size(response)
+        )
+        if duration * 1000 >= settings.SLOW_REQUEST_THRESHOLD:
+            self.log_slow_request(request, view_name, duration, collector)
+        return response
+
+    def log_slow_request(self, request, view_name, duration, collector):
+        queries = sorted(
+            collector.queries, key=lambda query: query[2], reverse=True
+        )[:SLOW_REQUEST_MAX_QUERIES]
+        logger.warning(
+            'Медленный запрос %s %s (%s): %.0f мс, SQL: %d за %.0f мс, '
+            'повторов: %d\n%s',
+            request.method,
+            request.get_full_path(),
+            view_name,
+            duration * 1000,
+            len(collector.queries),
+            collector.duration * 1000,
+            collector.duplicates,
+            '\n'.join(
+                f'{query_duration * 1000:.1f} мс: {sql}'
+                for sql, _, query_duration in queries
+            )
+        )
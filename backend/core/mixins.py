@@ -1,5 +1,17 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from core.cache import (get_cached_content, get_query_hash, get_version,
+                        get_versions)
+from core.constants import REFERENCE_CACHE_TIMEOUT, RESPONSE_CACHE_TIMEOUT
+
 
 class UpdateModelMixin:
     """Частичное обновление экземпляра модели."""
@@ -20,3 +32,147 @@ class UpdateModelMixin:
     def partial_update(self, request, *args, **kwargs):
         kwargs['partial'] = True
         return self.update(request, *args, **kwargs)
+
+
+class CachedListMixin:
+    """Отдает список из кэша готовым JSON и поддерживает ETag.
+
+    Кэш сбрасывается сменой версии cache_version_name.
+    """
+    cache_version_name = None
+
+    def list(self, request, *args, **kwargs):
+        key = (
+            f'list:{self.cache_version_name}:'
+            f'{get_version(self.cache_version_name)}:'
+            f'{get_query_hash(request.query_params)}'
+        )
+        etag, content = get_cached_content(
+            key,
+            lambda: JSONRenderer().render(
+                super(CachedListMixin, self).list(
+                    request, *args, **kwargs
+                ).data
+            ),
+            REFERENCE_CACHE_TIMEOUT
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                content,
+                content_type=JSONRenderer.media_type
+            )
+        response['ETag'] = etag
+        return response
+
+
+class AnonymousCacheMixin:
+    """Кэширует ответы list и retrieve для анонимных пользователей.
+
+    Запись в кэше хранит версии наборов данных, от которых она зависит,
+    и считается устаревшей, как только любая из них сменилась.
+    Наборы задают get_cache_tags() и get_object_cache_tags().
+
+    Last-Modified отдается только для retrieve и равен времени сборки
+    записи: запись пересобирается при смене любой версии, поэтому время
+    не отстает от изменений, которые не трогают сам объект. У списка
+    состав страницы меняется и без изменения ее объектов, ему хватает
+    ETag.
+    """
+    cache_query_params = ('page', 'limit', 'cursor', 'pagination')
+
+    def get_cache_tags(self):
+        return ()
+
+    def get_object_cache_tags(self, instance):
+        return ()
+
+    def get_cache_key(self, request):
+        allowed = set(self.cache_query_params)
+        filterset_class = getattr(self, 'filterset_class', None)
+        if filterset_class is not None:
+            allowed.update(filterset_class.base_filters)
+        query = request.query_params.copy()
+        for name in set(query) - allowed:
+            del query[name]
+        return (
+            f'response:{self.basename}:{self.action}:'
+            f'{request.scheme}://{request.get_host()}:'
+            f'{self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)}:'
+            f'{get_query_hash(query)}'
+        )
+
+    def get_cached_response(self, request, build, last_modified=False):
+        if request.user.is_authenticated:
+            return None
+        key = self.get_cache_key(request)
+        entry = cache.get(key)
+        if entry is None or (
+            get_versions(*entry['versions']) != entry['versions']
+        ):
+            versions = get_versions(*self.get_cache_tags())
+            data, instances = build()
+            object_tags = {
+                tag
+                for instance in instances
+                for tag in self.get_object_cache_tags(instance)
+            }
+            versions.update(get_versions(*(object_tags - set(versions))))
+            content = JSONRenderer().render(data)
+            entry = {
+                'versions': versions,
+                'content': content,
+                'etag': '"{}"'.format(hashlib.md5(
+                    content, usedforsecurity=False
+                ).hexdigest()),
+                'built_at': int(time.time()),
+            }
+            cache.set(key, entry, RESPONSE_CACHE_TIMEOUT)
+        built_at = entry['built_at'] if last_modified else None
+        response = get_conditional_response(
+            request,
+            etag=entry['etag'],
+            last_modified=built_at
+        )
+        if response is None:
+            response = HttpResponse(
+                entry['content'],
+                content_type=JSONRenderer.media_type
+            )
+        response['ETag'] = entry['etag']
+        if built_at:
+            response['Last-Modified'] = http_date(built_at)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self._page_instances = page
+        return page
+
+    def build_list(self, request, *args, **kwargs):
+        data = super().list(request, *args, **kwargs).data
+        return data, getattr(self, '_page_instances', None) or []
+
+    def build_retrieve(self):
+        instance = self.get_object()
+        return self.get_serializer(instance).data, [instance]
+
+    def list(self, request, *args, **kwargs):
+        response = self.get_cached_response(
+            request,
+            lambda: self.build_list(request, *args, **kwargs)
+        )
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = self.get_cached_response(
+            request,
+            self.build_retrieve,
+            last_modified=True
+        )
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return response
@@ -1,6 +1,85 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from core.constants import RECIPES_PER_PAGE
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Пагинация по курсору для ленты рецептов без OFFSET и COUNT(*)."""
+    page_size = RECIPES_PER_PAGE
+    page_size_query_param = 'limit'
+    ordering = ('-created_at', '-id')
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключам (created_at, id), собранным вне queryset.
+
+    Курсор — ключ последней строки страницы. Функция get_keys(position,
+    limit) возвращает не больше limit ключей строго после position,
+    новые сверху. Переход назад не поддерживается.
+    """
+    page_size = RECIPES_PER_PAGE
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return page_size if page_size > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            created_at, pk = urlsafe_b64decode(
+                encoded.encode('ascii')
+            ).decode('ascii').split('|')
+            return datetime.fromisoformat(created_at), int(pk)
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, key):
+        created_at, pk = key
+        return urlsafe_b64encode(
+            f'{created_at.isoformat()}|{pk}'.encode('ascii')
+        ).decode('ascii')
+
+    def paginate_keys(self, get_keys, request):
+        self.request = request
+        limit = self.get_page_size(request)
+        keys = get_keys(self.decode_cursor(request), limit + 1)
+        self.has_next = len(keys) > limit
+        self.keys = keys[:limit]
+        return self.keys
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.keys[-1])
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
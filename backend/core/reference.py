@@ -0,0 +1,47 @@
+from threading import Lock
+
+from core.cache import get_version
+
+
+class ReferenceIndex:
+    """Справочник {id: объект} в памяти процесса.
+
+    Перестраивается, когда меняется версия version_name в кэше.
+    Id, которых нет в индексе, перепроверяются в базе одним запросом:
+    так только что созданный объект не будет отвергнут до перестройки.
+    """
+
+    def __init__(self, model, version_name):
+        self.model = model
+        self.version_name = version_name
+        self._lock = Lock()
+        self._version = None
+        self._objects = {}
+
+    def __deepcopy__(self, memo):
+        # Поля DRF копируются для каждого сериализатора, индекс — общий.
+        return self
+
+    def get_objects(self):
+        version = get_version(self.version_name)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._objects = {
+                        obj.pk: obj for obj in self.model.objects.all()
+                    }
+                    self._version = version
+        return self._objects
+
+    def resolve(self, ids):
+        """Возвращает пару ({id: объект}, отсутствующие id)."""
+        objects = self.get_objects()
+        found = {pk: objects[pk] for pk in ids if pk in objects}
+        missing = set(ids) - set(found)
+        if missing:
+            fetched = self.model.objects.in_bulk(missing)
+            if fetched:
+                found.update(fetched)
+                missing -= set(fetched)
+                self._version = None
+        return found, missing
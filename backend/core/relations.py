@@ -0,0 +1,74 @@
+from django.db import IntegrityError, transaction
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import ValidationError
+
+from core.utils import count_of
+from recipes.models import Recipe
+
+
+class UserRecipeRelation:
+    """Связь пользователь–рецепт: избранное, список покупок.
+
+    Уникальность пары проверяет ограничение в базе, поэтому добавление —
+    одна попытка вставки, а удаление — один DELETE по паре. Счетчик в
+    рецепте меняют сигналы модели связи, поэтому он учитывает и связи,
+    созданные в админке или в shell.
+    """
+    recipe_fields = ('id', 'name', 'image', 'cooking_time')
+
+    def __init__(self, model, counter_field, exists_message,
+                 missing_message, on_bulk_change=None):
+        self.model = model
+        self.counter_field = counter_field
+        self.exists_message = exists_message
+        self.missing_message = missing_message
+        self.on_bulk_change = on_bulk_change
+
+    def add(self, user, recipe_id):
+        """Создает связь; рецепт для ответа уже загружен в obj.recipe."""
+        recipe = get_object_or_404(
+            Recipe.objects.only(*self.recipe_fields),
+            pk=recipe_id
+        )
+        try:
+            with transaction.atomic():
+                obj = self.model.objects.create(user=user, recipe=recipe)
+        except IntegrityError:
+            raise ValidationError({'detail': self.exists_message})
+        return obj
+
+    def remove(self, user, recipe_id):
+        """Удаляет связь; рецепт ищется, только если удалять было нечего."""
+        deleted, _ = self.model.objects.filter(
+            user=user,
+            recipe_id=recipe_id
+        ).delete()
+        if not deleted:
+            get_object_or_404(Recipe.objects.only('id'), pk=recipe_id)
+            raise ValidationError({'detail': self.missing_message})
+
+    def apply(self, user, add_ids, remove_ids):
+        """Добавляет и удаляет связи пачкой.
+
+        Вставка идет одним bulk_create с ignore_conflicts, удаление —
+        одним DELETE. bulk_create не отправляет сигналы, поэтому
+        on_bulk_change вызывается явно, а счетчики затронутых рецептов
+        пересчитываются одним UPDATE поверх изменений от post_delete.
+        """
+        if remove_ids:
+            self.model.objects.filter(
+                user=user,
+                recipe_id__in=remove_ids
+            ).delete()
+        if add_ids:
+            self.model.objects.bulk_create(
+                [self.model(user=user, recipe_id=pk) for pk in add_ids],
+                ignore_conflicts=True
+            )
+        affected = set(add_ids) | set(remove_ids)
+        if affected:
+            Recipe.objects.filter(pk__in=affected).update(**{
+                self.counter_field: count_of(self.model, 'recipe')
+            })
+            if self.on_bulk_change is not None:
+                self.on_bulk_change(user.id)
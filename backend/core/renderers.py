@@ -0,0 +1,97 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+from core.utils import ShoppingCartPDFGenerator
+
+
+class EchoBuffer:
+    """Псевдо-буфер для csv.writer, возвращающий записанную строку."""
+    def write(self, value):
+        return value
+
+
+class ShoppingListRenderer(BaseRenderer):
+    """Базовый рендерер списка покупок.
+
+    Рендереры выбираются стандартным согласованием содержимого DRF
+    по параметру ?format= или заголовку Accept, а сам файл отдается
+    потоком через stream().
+    """
+    filename = 'shopping_cart'
+    cacheable = False
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b''.join(self.stream(data['user'], data['ingredients']))
+
+    def stream(self, user, ingredients):
+        raise NotImplementedError(
+            'Метод stream() должен быть переопределен.'
+        )
+
+    def get_content_type(self):
+        if self.charset:
+            return f'{self.media_type}; charset={self.charset}'
+        return self.media_type
+
+    def get_filename(self):
+        return f'{self.filename}.{self.format}'
+
+
+class PDFShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+    render_style = 'binary'
+    cacheable = True
+
+    def stream(self, user, ingredients):
+        return ShoppingCartPDFGenerator(user, ingredients).stream()
+
+
+class TextShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, user, ingredients):
+        yield f'Список покупок для {user.username}\n\n'.encode(self.charset)
+        for ingredient in ingredients:
+            yield (
+                f'{ingredient["ingredient__name"]} - '
+                f'{ingredient["total_amount"]} '
+                f'{ingredient["ingredient__measurement_unit"]}\n'
+            ).encode(self.charset)
+
+
+class CSVShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, user, ingredients):
+        writer = csv.writer(EchoBuffer())
+        yield writer.writerow(
+            ('name', 'measurement_unit', 'amount')
+        ).encode(self.charset)
+        for ingredient in ingredients:
+            yield writer.writerow((
+                ingredient['ingredient__name'],
+                ingredient['ingredient__measurement_unit'],
+                ingredient['total_amount'],
+            )).encode(self.charset)
+
+
+class JSONShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'application/json'
+    format = 'json'
+
+    def stream(self, user, ingredients):
+        separator = '['
+        for ingredient in ingredients:
+            yield (separator + json.dumps({
+                'name': ingredient['ingredient__name'],
+                'measurement_unit': ingredient['ingredient__measurement_unit'],
+                'amount': float(ingredient['total_amount']),
+            }, ensure_ascii=False)).encode(self.charset)
+            separator = ','
+        yield b'[]' if separator == '[' else b']'
@@ -0,0 +1,134 @@
+import base64
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from recipes.models import Recipe
+
+User = get_user_model()
+
+# Кэш в памяти процесса: тесты могут очищать его, не трогая общий кэш.
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    }
+}
+
+
+def create_user(username, **fields):
+    """Пользователь с заполненными обязательными полями."""
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        username=username,
+        first_name='Имя',
+        last_name='Фамилия',
+        password='Pass-word-1',
+        **fields
+    )
+
+
+def create_recipe(author, name='Рецепт', **fields):
+    """Рецепт без картинки на диске: файл тестам не нужен."""
+    return Recipe.objects.create(
+        author=author,
+        name=name,
+        text='Описание',
+        cooking_time=10,
+        image='recipes/images/test.png',
+        **fields
+    )
+
+
+def make_data_url(size=(40, 30), wrap=False):
+    """PNG из шума в data URL; wrap разбивает base64 на строки."""
+    buffer = io.BytesIO()
+    Image.effect_noise(size, 64).save(buffer, format='PNG')
+    encoded = (
+        base64.encodebytes if wrap else base64.b64encode
+    )(buffer.getvalue()).decode('ascii')
+    return f'data:image/png;base64,{encoded}'
+
+
+class TempMediaMixin:
+    """Тесты с файлами во временном MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class UserRecipeRelationTestMixin:
+    """Проверки эндпоинта связи пользователь–рецепт.
+
+    Наследник задает модель связи, url_name (избранное, список покупок),
+    поле счетчика и число SQL-запросов каждого шага в queries. В тестах
+    atomic() дает SAVEPOINT и RELEASE, они тоже считаются.
+    """
+    model = None
+    url_name = None
+    counter_field = None
+    queries = None
+
+    def setUp(self):
+        self.user = create_user('reader')
+        self.recipe = create_recipe(create_user('author'))
+        self.url = self.get_url(self.recipe.pk)
+        self.client.force_authenticate(self.user)
+
+    def get_url(self, recipe_id):
+        return f'/api/recipes/{recipe_id}/{self.url_name}/'
+
+    def assert_request(self, method, url, status_code, step):
+        with self.assertNumQueries(self.queries[step]):
+            response = getattr(self.client, method)(url)
+        self.assertEqual(response.status_code, status_code)
+
+    def assert_counter(self, count):
+        self.recipe.refresh_from_db()
+        self.assertEqual(getattr(self.recipe, self.counter_field), count)
+
+    def test_add_and_remove(self):
+        self.assert_request('post', self.url, 201, 'add')
+        self.assert_request('post', self.url, 400, 'add_existing')
+        self.assert_counter(1)
+        self.assert_request('delete', self.url, 204, 'remove')
+        self.assert_request('delete', self.url, 400, 'remove_missing')
+        self.assert_counter(0)
+
+    def test_unknown_recipe(self):
+        url = self.get_url(self.recipe.pk + 1)
+        self.assert_request('post', url, 404, 'add_unknown')
+        self.assert_request('delete', url, 404, 'remove_unknown')
+
+    def test_admin_created_relation(self):
+        opts = self.model._meta
+        self.client.force_login(create_user(
+            'admin', is_staff=True, is_superuser=True
+        ))
+        response = self.client.post(
+            reverse(f'admin:{opts.app_label}_{opts.model_name}_add'),
+            {'user': self.user.pk, 'recipe': self.recipe.pk}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assert_counter(1)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assert_counter(0)
+
+    def test_remove_with_stale_counter(self):
+        self.model.objects.create(user=self.user, recipe=self.recipe)
+        Recipe.objects.filter(pk=self.recipe.pk).update(
+            **{self.counter_field: 0}
+        )
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assert_counter(0)
@@ -0,0 +1,179 @@
+import io
+import os
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from core.constants import IMAGE_RELEASE_GRACE_MINUTES
+from core.images import (decode_base64_image, generate_variants,
+                         get_variant_urls, release_image)
+from core.reference import ReferenceIndex
+from core.storage import image_storage
+from core.testing import (TEST_CACHES, TempMediaMixin, create_user,
+                          make_data_url)
+from ingredients.models import Ingredient
+
+
+class ImageStorageTest(TempMediaMixin, TestCase):
+    """Дедупликация загрузок и отложенное удаление изображений."""
+
+    def save(self):
+        return image_storage.save(
+            'recipes/images/photo.png', ContentFile(b'image', name='x.png')
+        )
+
+    def make_old(self, name):
+        past = time.time() - (IMAGE_RELEASE_GRACE_MINUTES + 1) * 60
+        os.utime(image_storage.path(name), (past, past))
+
+    def test_repeated_upload_refreshes_mtime(self):
+        name = self.save()
+        self.make_old(name)
+        self.assertEqual(self.save(), name)
+        self.assertGreater(
+            os.path.getmtime(image_storage.path(name)),
+            time.time() - 60
+        )
+
+    def test_release_keeps_recent_files(self):
+        name = self.save()
+        release_image(name)
+        self.assertTrue(image_storage.exists(name))
+        self.make_old(name)
+        release_image(name)
+        self.assertFalse(image_storage.exists(name))
+
+
+class Base64ImageTest(TestCase):
+    """Декодирование data URL частями и лимиты загрузки."""
+
+    def decode(self, data):
+        with decode_base64_image(data) as file, Image.open(file) as image:
+            return image.size
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=10 * 1024 * 1024)
+    def test_wrapped_base64(self):
+        # Перенос по 76 символов сдвигает границы частей декодирования.
+        data = make_data_url((400, 400), wrap=True)
+        self.assertIn('\n', data)
+        self.assertEqual(self.decode(data), (400, 400))
+
+    def test_invalid_base64(self):
+        with self.assertRaisesMessage(
+            ValidationError, 'Загрузите корректное изображение.'
+        ):
+            decode_base64_image(make_data_url()[:-1])
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=1024)
+    def test_size_limit(self):
+        with self.assertRaisesMessage(ValidationError, 'не должен превышать'):
+            decode_base64_image(make_data_url((100, 100)))
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=40 * 30)
+    def test_pixel_limit(self):
+        self.assertEqual(self.decode(make_data_url((40, 30))), (40, 30))
+        with self.assertRaisesMessage(ValidationError, '41x30 пикселей'):
+            decode_base64_image(make_data_url((41, 30)))
+
+
+class ImageVariantsTest(TempMediaMixin, TestCase):
+    """Ссылки на копии появляются только после их создания."""
+
+    def setUp(self):
+        super().setUp()
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), 'orange').save(buffer, format='PNG')
+        user = create_user('user')
+        user.avatar.save('photo.png', ContentFile(buffer.getvalue()))
+        self.avatar = user.avatar
+
+    def get_urls(self):
+        return {
+            url
+            for formats in get_variant_urls(self.avatar).values()
+            for url in formats.values()
+        }
+
+    def test_original_until_generated(self):
+        self.assertEqual(self.get_urls(), {self.avatar.url})
+        call_command('generate_image_variants', stdout=io.StringIO())
+        urls = self.get_urls()
+        self.assertNotIn(self.avatar.url, urls)
+        for url in urls:
+            self.assertTrue(image_storage.exists(
+                url.removeprefix(image_storage.base_url)
+            ))
+        self.assertFalse(generate_variants(self.avatar.name))
+
+
+@override_settings(REQUEST_METRICS=True, SLOW_REQUEST_THRESHOLD=0)
+class SlowRequestLogTest(APITestCase):
+    """В журнал медленных запросов попадает SQL без параметров."""
+
+    def test_params_are_not_logged(self):
+        with self.assertLogs('foodgram.slow_requests') as logs:
+            self.client.post(
+                '/api/auth/token/login/',
+                {'email': 'secret@example.com', 'password': 'Secret-pass'}
+            )
+        output = '\n'.join(logs.output)
+        self.assertIn('SELECT', output)
+        self.assertNotIn('secret@example.com', output)
+
+
+class BenchmarkCommandTest(TestCase):
+    """Нагрузочные тесты не пишут в базу без явного согласия."""
+
+    def test_refuses_without_debug(self):
+        with self.assertRaisesMessage(CommandError, '--i-know'):
+            call_command('benchmark_ingredient_search')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReferenceIndexTest(TestCase):
+    """Справочник в памяти и его перепроверка по базе."""
+
+    def setUp(self):
+        cache.clear()
+        self.index = ReferenceIndex(Ingredient, 'ingredients')
+        self.flour, self.salt = Ingredient.objects.bulk_create([
+            Ingredient(name='Мука', measurement_unit='г'),
+            Ingredient(name='Соль', measurement_unit='г'),
+        ])
+        self.index.get_objects()
+
+    def test_known_ids_without_queries(self):
+        with self.assertNumQueries(0):
+            found, missing = self.index.resolve([self.salt.pk, self.flour.pk])
+        self.assertEqual(found, {self.flour.pk: self.flour,
+                                 self.salt.pk: self.salt})
+        self.assertEqual(missing, set())
+
+    def test_new_object_before_rebuild(self):
+        # bulk_create не меняет версию: так выглядит объект, созданный
+        # в другом процессе до перестройки справочника.
+        [sugar] = Ingredient.objects.bulk_create(
+            [Ingredient(name='Сахар', measurement_unit='г')]
+        )
+        with self.assertNumQueries(1):
+            found, missing = self.index.resolve([sugar.pk])
+        self.assertEqual((list(found), missing), ([sugar.pk], set()))
+        with self.assertNumQueries(1):
+            self.index.resolve([sugar.pk])
+        self.assertIn(sugar.pk, self.index.get_objects())
+
+    def test_unknown_id(self):
+        with self.assertNumQueries(1):
+            found, missing = self.index.resolve([self.flour.pk, 10 ** 6])
+        self.assertEqual((list(found), missing), ([self.flour.pk], {10 ** 6}))
+
+    def test_deleted_object(self):
+        pk = self.salt.pk
+        self.salt.delete()
+        self.assertEqual(self.index.resolve([pk]), ({}, {pk}))
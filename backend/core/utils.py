@@ -1,29 +1,59 @@
 import os
-import io
+import tempfile
+from functools import lru_cache
 
 from django.conf import settings
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 
+from core.constants import PDF_FONT_NAME, SPOOL_MAX_SIZE, STREAM_CHUNK_SIZE
+
+FONT_PATH = os.path.join(settings.BASE_DIR, 'fonts', 'Stamps.ttf')
+
+
+@lru_cache(maxsize=None)
+def register_pdf_font():
+    """Регистрирует шрифт для PDF один раз за время жизни процесса."""
+    pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, FONT_PATH))
+    return PDF_FONT_NAME
+
+
+def update_counter(queryset, field, delta):
+    """Атомарно меняет счетчик на delta выражением F().
+
+    Счетчик не опускается ниже нуля: если он когда-то разошелся со
+    связями, удаление не упадет на CHECK поля PositiveIntegerField,
+    а точное значение вернет команда recount.
+    """
+    return queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def count_of(model, field):
+    """Подзапрос с количеством строк model, ссылающихся на объект."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total'),
+        output_field=IntegerField()
+    ), 0)
+
 
 class ShoppingCartPDFGenerator:
     def __init__(self, user, ingredients_summary):
         self.user = user
         self.ingredients_summary = ingredients_summary
 
-    def generate(self):
-        """Генерация PDF-файла со списком покупок."""
-        FONT_PATH = os.path.join(
-            settings.BASE_DIR,
-            'fonts',
-            'Stamps.ttf'
-        )
-        buffer = io.BytesIO()
-        pdfmetrics.registerFont(TTFont('Stamps', FONT_PATH))
-        pdf_canvas = canvas.Canvas(buffer, pagesize=A4)
-        pdf_canvas.setFont('Stamps', 12)
+    def write(self, output):
+        """Записывает PDF-файл со списком покупок в output."""
+        font_name = register_pdf_font()
+        pdf_canvas = canvas.Canvas(output, pagesize=A4)
+        pdf_canvas.setFont(font_name, 12)
         width, height = A4
         pdf_canvas.drawString(
             50, height - 50,
@@ -40,8 +70,14 @@ class ShoppingCartPDFGenerator:
             y_position -= 20
             if y_position < 50:
                 pdf_canvas.showPage()
-                pdf_canvas.setFont('Stamps', 12)
+                pdf_canvas.setFont(font_name, 12)
                 y_position = height - 50
         pdf_canvas.save()
-        buffer.seek(0)
-        return buffer.getvalue()
+
+    def stream(self, chunk_size=STREAM_CHUNK_SIZE):
+        """Отдает PDF-файл частями, не держа большие документы в памяти."""
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as output:
+            self.write(output)
+            output.seek(0)
+            while chunk := output.read(chunk_size):
+                yield chunk
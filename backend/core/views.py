@@ -0,0 +1,16 @@
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from core.metrics import request_metrics
+
+
+class MetricsView(APIView):
+    """Статистика запросов в формате Prometheus для персонала."""
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return HttpResponse(
+            request_metrics.export(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
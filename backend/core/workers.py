@@ -0,0 +1,47 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    """Пул потоков для фоновых задач текущего процесса."""
+    global _executor
+    if _executor is None and settings.BACKGROUND_WORKERS:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BACKGROUND_WORKERS,
+            thread_name_prefix='foodgram-worker'
+        )
+    return _executor
+
+
+def run_task(func, *args):
+    """Выполняет задачу и закрывает соединение потока с базой данных."""
+    close_old_connections()
+    try:
+        return func(*args)
+    except Exception:
+        # Future из пула никто не проверяет: без лога ошибка потеряется.
+        logger.exception('Фоновая задача %s завершилась ошибкой', func)
+        raise
+    finally:
+        close_old_connections()
+
+
+def submit(func, *args):
+    """Ставит задачу в пул потоков; без пула возвращает None."""
+    executor = get_executor()
+    if executor is None:
+        return None
+    return executor.submit(run_task, func, *args)
+
+
+def run_in_background(func, *args):
+    """Передает задачу пулу потоков, а без пула выполняет ее сразу."""
+    if submit(func, *args) is None:
+        func(*args)
@@ -6,3 +6,6 @@ class FavoriteConfig(AppConfig):
     name = 'favorite'
     verbose_name = 'Избранное'
     verbose_name_plural = 'Избранное'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:02
+
+import datetime
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('favorite', '0003_initial'),
+    ]
+
+    # Время добавления старых строк неизвестно. Они получают дату
+    # RANKING_EPOCH, чтобы не попасть в тренды как свежие события.
+    operations = [
+        migrations.AddField(
+            model_name='favorite',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=datetime.datetime(2024, 1, 1, 0, 0, tzinfo=datetime.timezone.utc), verbose_name='Добавлено'),
+            preserve_default=False,
+        ),
+    ]
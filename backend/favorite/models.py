@@ -20,6 +20,11 @@ class Favorite(models.Model):
         related_name='favorites',
         verbose_name='Избранное'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Добавлено'
+    )
 
     class Meta:
         verbose_name = 'Избранный рецепт'
@@ -1,7 +1,5 @@
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
-from recipes.models import Recipe
 from .models import Favorite
 
 
@@ -32,17 +30,3 @@ class FavoriteSerializer(serializers.ModelSerializer):
             'image',
             'cooking_time'
         )
-
-    def validate(self, attrs):
-        user = self.context['request'].user
-        recipe_id = self.context['view'].kwargs.get('pk')
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-        if recipe.favorites.filter(user=user).exists():
-            raise serializers.ValidationError('Этот рецепт уже в избранном.')
-        return attrs
-
-    def create(self, validated_data):
-        user = self.context['request'].user
-        recipe_id = self.context['view'].kwargs.get('pk')
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-        return Favorite.objects.create(user=user, recipe=recipe)
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.utils import update_counter
+from recipes.models import Recipe
+from .models import Favorite
+
+
+@receiver(post_save, sender=Favorite)
+def favorite_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        update_counter(
+            Recipe.objects.filter(pk=instance.recipe_id),
+            'favorites_count',
+            1
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+def favorite_deleted(sender, instance, **kwargs):
+    update_counter(
+        Recipe.objects.filter(pk=instance.recipe_id),
+        'favorites_count',
+        -1
+    )
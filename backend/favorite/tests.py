@@ -0,0 +1,19 @@
+from rest_framework.test import APITestCase
+
+from core.testing import UserRecipeRelationTestMixin
+from .models import Favorite
+
+
+class FavoriteRelationTest(UserRecipeRelationTestMixin, APITestCase):
+    """Добавление и удаление из избранного — фиксированное число SQL."""
+    model = Favorite
+    url_name = 'favorite'
+    counter_field = 'favorites_count'
+    queries = {
+        'add': 5,
+        'add_existing': 5,
+        'remove': 3,
+        'remove_missing': 2,
+        'add_unknown': 1,
+        'remove_unknown': 2,
+    }
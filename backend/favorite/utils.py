@@ -0,0 +1,9 @@
+from core.relations import UserRecipeRelation
+from .models import Favorite
+
+favorite_relation = UserRecipeRelation(
+    Favorite,
+    'favorites_count',
+    exists_message='Этот рецепт уже в избранном.',
+    missing_message='Рецепт не найден в избранном.'
+)
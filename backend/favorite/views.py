@@ -1,4 +1,3 @@
-from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.mixins import ListModelMixin
@@ -6,9 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from recipes.models import Recipe
 from .models import Favorite
 from .serializers import FavoriteSerializer
+from .utils import favorite_relation
 
 
 class FavoriteViewSet(ListModelMixin, GenericViewSet):
@@ -32,21 +31,13 @@ class FavoriteViewSet(ListModelMixin, GenericViewSet):
         url_path='favorite'
     )
     def add_to_favorite(self, request, pk=None):
-        serializer = self.get_serializer(data={})
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        favorite = favorite_relation.add(request.user, pk)
+        serializer = self.get_serializer(favorite)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @add_to_favorite.mapping.delete
     def remove_from_favorite(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        favorite = recipe.favorites.filter(user=request.user)
-        if not favorite.exists():
-            return Response(
-                {'detail': 'Рецепт не найден в избранном.'},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        favorite.delete()
+        favorite_relation.remove(request.user, pk)
         return Response(
             {'detail': 'Рецепт удален из избранного.'},
             status=status.HTTP_204_NO_CONTENT,
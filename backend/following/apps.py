@@ -6,3 +6,6 @@ class FollowingConfig(AppConfig):
     name = 'following'
     verbose_name = 'Подписка'
     verbose_name_plural = 'Подписки'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,112 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+
+from core.constants import FEED_BATCH_SIZE, FEED_FANOUT_LIMIT
+from recipes.models import Recipe
+from .models import FeedEntry, Follow
+
+
+def create_entries(entries):
+    while batch := list(islice(entries, FEED_BATCH_SIZE)):
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def push_recipe_to_feeds(recipe_id):
+    """Рассылает рецепт в ленты подписчиков автора (fan-out on write).
+
+    Рецепты авторов с числом подписчиков больше FEED_FANOUT_LIMIT не
+    рассылаются: лента читает их напрямую (fan-out on read).
+    """
+    push_recipes_to_feeds([recipe_id])
+
+
+@transaction.atomic
+def push_recipes_to_feeds(recipe_ids):
+    """Рассылает несколько рецептов, читая подписчиков автора один раз.
+
+    Записи ленты и отметка pushed_to_feed фиксируются вместе: пока
+    рассылка не завершилась, рецепт читается напрямую.
+    """
+    recipes_by_author = defaultdict(list)
+    for recipe in Recipe.objects.filter(
+        pk__in=recipe_ids,
+        author__followers_count__lte=FEED_FANOUT_LIMIT
+    ).only('id', 'author_id', 'created_at'):
+        recipes_by_author[recipe.author_id].append(recipe)
+    for author_id, recipes in recipes_by_author.items():
+        create_entries(
+            FeedEntry(
+                user_id=user_id,
+                recipe_id=recipe.id,
+                created_at=recipe.created_at
+            )
+            for user_id in Follow.objects.filter(
+                following_id=author_id
+            ).values_list('user_id', flat=True).iterator()
+            for recipe in recipes
+        )
+    return Recipe.objects.filter(
+        pk__in=[
+            recipe.id
+            for recipes in recipes_by_author.values()
+            for recipe in recipes
+        ]
+    ).update(pushed_to_feed=True)
+
+
+def add_author_to_feed(user, author):
+    """Добавляет в ленту уже разосланные рецепты нового автора."""
+    create_entries(
+        FeedEntry(user=user, recipe_id=recipe_id, created_at=created_at)
+        for recipe_id, created_at in Recipe.objects.filter(
+            author=author,
+            pushed_to_feed=True
+        ).values_list('id', 'created_at').iterator()
+    )
+
+
+def remove_author_from_feed(user, author):
+    FeedEntry.objects.filter(user=user, recipe__author=author).delete()
+
+
+def before(queryset, position, id_field):
+    """Строки строго после ключа position при сортировке по убыванию."""
+    if position is None:
+        return queryset
+    created_at, pk = position
+    return queryset.filter(created_at__lte=created_at).exclude(
+        created_at=created_at,
+        **{f'{id_field}__gte': pk}
+    )
+
+
+def get_feed_keys(user, position, limit):
+    """Ключи (created_at, id) следующих limit рецептов ленты.
+
+    Разосланные рецепты читаются из FeedEntry по индексу
+    (user, -created_at, -recipe). К ним подмешиваются все неразосланные
+    рецепты подписок по частичному индексу recipe_unpushed_idx: авторы
+    сверх FEED_FANOUT_LIMIT, рецепты, рассылка которых еще идет или
+    упала, и рецепты автора, который с тех пор опустился ниже лимита.
+    У каждого источника берется не больше limit строк после курсора.
+    """
+    entries = before(
+        FeedEntry.objects.filter(user=user),
+        position,
+        'recipe_id'
+    ).order_by('-created_at', '-recipe_id').values_list(
+        'created_at', 'recipe_id'
+    )[:limit]
+    pulled = before(
+        Recipe.objects.filter(
+            pushed_to_feed=False,
+            author__in=Follow.objects.filter(user=user).values(
+                'following_id'
+            )
+        ),
+        position,
+        'id'
+    ).order_by('-created_at', '-id').values_list('created_at', 'id')[:limit]
+    return sorted({*entries, *pulled}, reverse=True)[:limit]
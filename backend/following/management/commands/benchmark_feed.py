@@ -0,0 +1,199 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+
+from core.benchmarks import BenchmarkCommand, percentile, rolled_back
+from core.constants import FEED_FANOUT_LIMIT
+from core.utils import count_of
+from following.feed import before, get_feed_keys, push_recipes_to_feeds
+from following.models import FeedEntry, Follow
+from recipes.models import Recipe
+
+User = get_user_model()
+
+BATCH_SIZE = 10000
+CELEBRITIES = 3
+CELEBRITY_RECIPES = 20
+
+
+def get_naive_keys(user, position, limit):
+    """Прямой JOIN Follow → User → Recipe с сортировкой по времени."""
+    return list(before(
+        Recipe.objects.filter(author__who_follows__user=user),
+        position,
+        'id'
+    ).order_by('-created_at', '-id').values_list('created_at', 'id')[:limit])
+
+
+MODES = {'naive': get_naive_keys, 'timeline': get_feed_keys}
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Нагрузочный тест ленты подписок: гибридная лента на FeedEntry '
+        'против прямого JOIN по подпискам. Данные добавляются в '
+        'транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=100000,
+            help='Количество пользователей'
+        )
+        parser.add_argument(
+            '--follows',
+            type=int,
+            default=1000000,
+            help='Количество подписок'
+        )
+        parser.add_argument(
+            '--authors',
+            type=int,
+            default=10000,
+            help='Сколько пользователей публикуют рецепты'
+        )
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=40000,
+            help='Количество рецептов обычных авторов'
+        )
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=200,
+            help='Сколько случайных читателей опрашивать'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Размер страницы'
+        )
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=5,
+            help='Сколько страниц пролистывает каждый читатель'
+        )
+
+    def create_users(self, count):
+        for start in range(0, count, BATCH_SIZE):
+            User.objects.bulk_create(
+                User(
+                    username=f'feed-user-{number}',
+                    email=f'feed-user-{number}@example.com',
+                    first_name='Имя',
+                    last_name='Фамилия',
+                    password='!'
+                )
+                for number in range(start, min(start + BATCH_SIZE, count))
+            )
+        return list(User.objects.filter(
+            username__startswith='feed-user-'
+        ).order_by('id').values_list('id', flat=True))
+
+    def create_follows(self, user_ids, authors, celebrities, count):
+        """Первые авторы — знаменитости с подписчиками сверх лимита."""
+        pairs = set()
+        fans = min(FEED_FANOUT_LIMIT + 1, len(user_ids))
+        for celebrity in celebrities:
+            for user_id in random.sample(user_ids, fans):
+                if user_id != celebrity:
+                    pairs.add((user_id, celebrity))
+        while len(pairs) < count:
+            user_id = random.choice(user_ids)
+            author_id = random.choice(authors)
+            if user_id != author_id:
+                pairs.add((user_id, author_id))
+        pairs = list(pairs)
+        for start in range(0, len(pairs), BATCH_SIZE):
+            Follow.objects.bulk_create(
+                Follow(user_id=user_id, following_id=author_id)
+                for user_id, author_id in pairs[start:start + BATCH_SIZE]
+            )
+        User.objects.filter(pk__in=authors + celebrities).update(
+            followers_count=count_of(Follow, 'following')
+        )
+
+    def create_recipes(self, authors, celebrities, count):
+        """Рецепты вперемешку по авторам, затем рассылка по лентам."""
+        owners = [authors[number % len(authors)] for number in range(count)]
+        owners += celebrities * CELEBRITY_RECIPES
+        random.shuffle(owners)
+        for start in range(0, len(owners), BATCH_SIZE):
+            batch = Recipe.objects.bulk_create(
+                Recipe(
+                    author_id=author_id,
+                    name='Рецепт',
+                    text='Описание',
+                    cooking_time=10,
+                    image='recipes/images/bench.png'
+                )
+                for author_id in owners[start:start + BATCH_SIZE]
+            )
+            push_recipes_to_feeds([recipe.pk for recipe in batch])
+
+    def populate(self, options):
+        random.seed(1)
+        user_ids = self.create_users(options['users'])
+        authors = user_ids[:options['authors']]
+        celebrities, authors = authors[:CELEBRITIES], authors[CELEBRITIES:]
+        self.create_follows(
+            user_ids, authors, celebrities, options['follows']
+        )
+        self.create_recipes(authors, celebrities, options['recipes'])
+        self.stdout.write(
+            f'Пользователей: {len(user_ids)}, '
+            f'подписок: {Follow.objects.count()}, '
+            f'рецептов: {Recipe.objects.count()}, '
+            f'записей ленты: {FeedEntry.objects.count()}'
+        )
+        return random.sample(user_ids, options['readers'])
+
+    def measure(self, readers, limit, pages):
+        for mode, get_keys in MODES.items():
+            first, later = [], []
+            for user in User.objects.filter(pk__in=readers):
+                position = None
+                for page in range(pages):
+                    start = time.perf_counter()
+                    keys = get_keys(user, position, limit)
+                    (later if page else first).append(
+                        time.perf_counter() - start
+                    )
+                    if len(keys) < limit:
+                        break
+                    position = keys[-1]
+            self.stdout.write(f'  {mode}')
+            for label, timings in (('первая', first), ('следующие', later)):
+                if timings:
+                    self.stdout.write(
+                        f'    {label:<10} '
+                        f'p50 {percentile(timings, 0.5) * 1000:8.2f} мс  '
+                        f'p99 {percentile(timings, 0.99) * 1000:8.2f} мс  '
+                        f'среднее {statistics.mean(timings) * 1000:8.2f} мс'
+                    )
+
+    def explain(self, user, limit):
+        self.stdout.write('Планы первой страницы:')
+        naive = Recipe.objects.filter(
+            author__who_follows__user=user
+        ).order_by('-created_at', '-id').values_list('created_at', 'id')
+        entries = FeedEntry.objects.filter(user=user).order_by(
+            '-created_at', '-recipe_id'
+        ).values_list('created_at', 'recipe_id')
+        for label, queryset in (('naive', naive), ('timeline', entries)):
+            self.stdout.write(f'  {label}:')
+            for line in queryset[:limit].explain().splitlines():
+                self.stdout.write(f'    {line}')
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            readers = self.populate(options)
+            self.measure(readers, options['limit'], options['pages'])
+            self.explain(User.objects.get(pk=readers[0]), options['limit'])
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.constants import FEED_BATCH_SIZE, FEED_FANOUT_LIMIT
+from following.feed import push_recipes_to_feeds
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        'Досылает в ленты рецепты, рассылка которых упала или прервалась. '
+        'Рецепты авторов сверх FEED_FANOUT_LIMIT лента читает напрямую.'
+    )
+
+    def handle(self, *args, **options):
+        recipe_ids = list(Recipe.objects.filter(
+            pushed_to_feed=False,
+            author__followers_count__lte=FEED_FANOUT_LIMIT
+        ).values_list('id', flat=True))
+        pushed = sum(
+            push_recipes_to_feeds(recipe_ids[start:start + FEED_BATCH_SIZE])
+            for start in range(0, len(recipe_ids), FEED_BATCH_SIZE)
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Разослано рецептов: {pushed}.'
+        ))
@@ -2,6 +2,8 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
 
+from recipes.models import Recipe
+
 User = get_user_model()
 
 
@@ -43,3 +45,39 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user} follows: {self.following}'
+
+
+class FeedEntry(models.Model):
+    """Запись ленты подписок, разосланная при публикации рецепта."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Подписчик'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Рецепт'
+    )
+    created_at = models.DateTimeField(verbose_name='Создан')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_feed_entry'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at', '-recipe'],
+                name='feed_entry_user_timeline_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} <- {self.recipe}'
@@ -1,17 +1,55 @@
+from collections import defaultdict
+
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import F, Manager, Window
+from django.db.models.functions import RowNumber
 from rest_framework import serializers
 
+from recipes.models import Recipe
 from recipes.serializers import RecipeShortSerializer
+from .feed import add_author_to_feed
 from .models import Follow
 
 User = get_user_model()
 
 
+def get_recipes_limit(request):
+    try:
+        recipes_limit = int(request.query_params.get('recipes_limit', 0))
+    except ValueError:
+        return 0
+    return max(recipes_limit, 0)
+
+
+class FollowListSerializer(serializers.ListSerializer):
+    """Загружает превью рецептов сразу для всей страницы авторов."""
+
+    def to_representation(self, data):
+        authors = list(data.all() if isinstance(data, Manager) else data)
+        recipes = Recipe.objects.filter(
+            author_id__in=[author.id for author in authors]
+        )
+        recipes_limit = get_recipes_limit(self.context['request'])
+        if recipes_limit:
+            recipes = recipes.annotate(row_number=Window(
+                RowNumber(),
+                partition_by=F('author_id'),
+                order_by=(F('created_at').desc(), F('id').desc())
+            )).filter(row_number__lte=recipes_limit)
+        previews = defaultdict(list)
+        for recipe in recipes:
+            previews[recipe.author_id].append(recipe)
+        for author in authors:
+            author.preview_recipes = previews[author.id]
+        return super().to_representation(authors)
+
+
 class FollowSerializer(serializers.ModelSerializer):
     """Сериализатор для подписок."""
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.IntegerField(source='recipes.count')
+    recipes_count = serializers.IntegerField(read_only=True)
     avatar = serializers.SerializerMethodField()
 
     class Meta:
@@ -27,22 +65,21 @@ class FollowSerializer(serializers.ModelSerializer):
             'recipes_count',
             'avatar'
         )
+        list_serializer_class = FollowListSerializer
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context['request'].user
         return user.following.filter(following=obj).exists()
 
     def get_recipes(self, obj):
-        request = self.context['request']
-        try:
-            recipes_limit = int(request.query_params.get('recipes_limit', 0))
-            if recipes_limit < 0:
-                recipes_limit = 0
-        except ValueError:
-            recipes_limit = 0
-        recipes = obj.recipes.all()
-        if recipes_limit:
-            recipes = recipes[:recipes_limit]
+        recipes = getattr(obj, 'preview_recipes', None)
+        if recipes is None:
+            recipes = obj.recipes.all()
+            recipes_limit = get_recipes_limit(self.context['request'])
+            if recipes_limit:
+                recipes = recipes[:recipes_limit]
         return RecipeShortSerializer(
             recipes,
             many=True,
@@ -76,10 +113,18 @@ class FollowCreateSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         following = validated_data['following']
-        return Follow.objects.create(
-            user=self.context['request'].user,
-            following=following
-        )
+        try:
+            with transaction.atomic():
+                follow = Follow.objects.create(
+                    user=self.context['request'].user,
+                    following=following
+                )
+                add_author_to_feed(follow.user, following)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {'following': 'Вы уже подписаны на этого пользователя.'}
+            )
+        return follow
 
     def to_representation(self, instance):
         return FollowSerializer(
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.utils import update_counter
+from .models import Follow
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        update_counter(
+            User.objects.filter(pk=instance.following_id),
+            'followers_count',
+            1
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    update_counter(
+        User.objects.filter(pk=instance.following_id),
+        'followers_count',
+        -1
+    )
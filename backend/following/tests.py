@@ -0,0 +1,207 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.constants import FEED_FANOUT_LIMIT
+from core.testing import create_recipe, create_user
+from recipes.models import Recipe
+from .feed import push_recipes_to_feeds
+from .models import FeedEntry, Follow
+
+User = get_user_model()
+
+
+class FollowCounterTest(APITestCase):
+    """Подписка и отписка меняют followers_count вместе со связью."""
+
+    def setUp(self):
+        self.user = create_user('reader')
+        self.author = create_user('author')
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/users/{self.author.pk}/subscribe/'
+
+    def assert_followers(self, count):
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, count)
+        self.assertEqual(
+            Follow.objects.filter(following=self.author).count(), count
+        )
+
+    def test_subscribe_and_unsubscribe(self):
+        self.assertEqual(self.client.post(self.url).status_code, 201)
+        self.assert_followers(1)
+        self.assertEqual(self.client.post(self.url).status_code, 400)
+        self.assert_followers(1)
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assert_followers(0)
+        self.assertEqual(self.client.delete(self.url).status_code, 400)
+        self.assert_followers(0)
+
+    def test_admin_created_follow(self):
+        self.client.force_login(create_user(
+            'admin', is_staff=True, is_superuser=True
+        ))
+        response = self.client.post(
+            reverse('admin:following_follow_add'),
+            {'user': self.user.pk, 'following': self.author.pk}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assert_followers(1)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assert_followers(0)
+
+
+class FeedTest(APITestCase):
+    """Лента листается по курсору и объединяет оба источника."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('reader')
+        small = create_user('small')
+        big = create_user('big')
+        stranger = create_user('stranger')
+        Follow.objects.bulk_create(
+            Follow(user=cls.user, following=author)
+            for author in (small, big)
+        )
+        User.objects.filter(pk=big.pk).update(
+            followers_count=FEED_FANOUT_LIMIT + 1
+        )
+        now = timezone.now()
+        recipes = []
+        for number in range(9):
+            recipe = create_recipe(
+                (small, big, stranger)[number % 3], f'Рецепт {number}'
+            )
+            Recipe.objects.filter(pk=recipe.pk).update(
+                created_at=now - timedelta(minutes=number // 2)
+            )
+            recipes.append(recipe)
+        push_recipes_to_feeds([recipe.pk for recipe in recipes])
+        cls.expected = list(Recipe.objects.filter(
+            author__in=(small, big)
+        ).order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def test_pages_follow_timeline_order(self):
+        self.client.force_authenticate(self.user)
+        url = '/api/recipes/feed/?limit=2'
+        seen = []
+        while url:
+            # FeedEntry, рецепты крупных авторов, рецепты, теги, ингредиенты.
+            with self.assertNumQueries(5):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [recipe['id'] for recipe in response.json()['results']]
+            url = response.json()['next']
+        self.assertEqual(seen, self.expected)
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/recipes/feed/?cursor=bad')
+        self.assertEqual(response.status_code, 404)
+
+
+class FeedRepairTest(APITestCase):
+    """Неразосланный рецепт виден в ленте, пока его не дошлют."""
+
+    def setUp(self):
+        self.user = create_user('reader')
+        self.author = create_user('author')
+        Follow.objects.create(user=self.user, following=self.author)
+        self.client.force_authenticate(self.user)
+
+    def get_feed(self):
+        response = self.client.get('/api/recipes/feed/')
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.json()['results']]
+
+    def assert_repaired(self, recipe):
+        self.assertEqual(self.get_feed(), [recipe.pk])
+        call_command('push_feeds', stdout=io.StringIO())
+        recipe.refresh_from_db()
+        self.assertTrue(recipe.pushed_to_feed)
+        self.assertEqual(self.get_feed(), [recipe.pk])
+
+    def test_author_dropped_below_limit(self):
+        User.objects.filter(pk=self.author.pk).update(
+            followers_count=FEED_FANOUT_LIMIT + 1
+        )
+        recipe = create_recipe(self.author)
+        push_recipes_to_feeds([recipe.pk])
+        User.objects.filter(pk=self.author.pk).update(followers_count=1)
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assert_repaired(recipe)
+
+    def test_failed_push(self):
+        recipe = create_recipe(self.author)
+        with mock.patch.object(
+            FeedEntry.objects, 'bulk_create', side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError):
+                push_recipes_to_feeds([recipe.pk])
+        recipe.refresh_from_db()
+        self.assertFalse(recipe.pushed_to_feed)
+        self.assert_repaired(recipe)
+
+
+class SubscriptionsTest(APITestCase):
+    """Подписки листаются в SQL, превью рецептов грузятся на страницу."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('reader')
+        cls.authors = [create_user(f'author{number}') for number in range(3)]
+        for author in reversed(cls.authors):
+            Follow.objects.create(user=cls.user, following=author)
+        now = timezone.now()
+        cls.recipes = {}
+        for author in cls.authors:
+            for number in range(3):
+                recipe = create_recipe(author, f'Рецепт {number}')
+                Recipe.objects.filter(pk=recipe.pk).update(
+                    created_at=now - timedelta(minutes=number)
+                )
+                cls.recipes.setdefault(author.pk, []).append(recipe.pk)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def get(self, **params):
+        # COUNT, страница авторов и превью рецептов всей страницы.
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/users/subscriptions/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_in_follow_order(self):
+        first = self.get(limit=2)
+        second = self.get(limit=2, page=2)
+        self.assertEqual(first['count'], 3)
+        self.assertEqual(
+            [author['id'] for author in first['results']
+             + second['results']],
+            [author.pk for author in reversed(self.authors)]
+        )
+        for author in first['results']:
+            self.assertTrue(author['is_subscribed'])
+            self.assertEqual(author['recipes_count'], 3)
+            self.assertEqual(len(author['recipes']), 3)
+
+    def test_recipes_limit(self):
+        for author in self.get(limit=3, recipes_limit=2)['results']:
+            self.assertEqual(
+                [recipe['id'] for recipe in author['recipes']],
+                self.recipes[author['id']][:2]
+            )
+
+    def test_invalid_recipes_limit(self):
+        for author in self.get(recipes_limit='много')['results']:
+            self.assertEqual(len(author['recipes']), 3)
@@ -5,15 +5,22 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
-from shopping_cart.views import DownloadShoppingCartView
+from core.views import MetricsView
+from shopping_cart.views import DownloadShoppingCartView, ShoppingListJobView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/_metrics/', MetricsView.as_view(), name='metrics'),
     path(
         'api/recipes/download_shopping_cart/',
         DownloadShoppingCartView.as_view(),
         name='download-shopping-cart'
     ),
+    path(
+        'api/recipes/download_shopping_cart/<uuid:job_id>/',
+        ShoppingListJobView.as_view(),
+        name='shopping-list-job'
+    ),
     path(
         'api/',
         include('recipes.urls', namespace='recipes')
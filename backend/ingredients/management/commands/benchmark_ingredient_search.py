@@ -0,0 +1,132 @@
+import random
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from core.benchmarks import BenchmarkCommand, percentile, rolled_back
+from core.cache import bump_version
+from core.constants import MAX_LENGTH
+from ingredients.models import Ingredient
+from ingredients.search import prefix_index, search_ingredients
+from .load_ingredients import read_csv
+
+
+def synthetic_names(names, start):
+    """Бесконечный поток уникальных названий на основе настоящих."""
+    number = start
+    while True:
+        for name in names:
+            suffix = f' {number:x}'
+            yield name[:MAX_LENGTH - len(suffix)] + suffix
+            number += 1
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Сравнивает поиск ингредиентов через icontains и через индекс '
+        'на настоящем наборе и на синтетическом до миллиона названий. '
+        'Данные добавляются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=str(
+                Path(settings.BASE_DIR).parent / 'data' / 'ingredients.csv'
+            ),
+            help='CSV с настоящими ингредиентами'
+        )
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[2186, 100000, 1000000],
+            help='Размеры таблицы для замеров'
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=200,
+            help='Количество запросов автодополнения на каждый размер'
+        )
+
+    def make_queries(self, names, count):
+        """Ввод по буквам: префиксы длиной 1–5 и подстроки из середины."""
+        random.seed(1)
+        queries = []
+        while len(queries) < count:
+            name = random.choice(names)
+            queries.extend(name[:length] for length in range(1, 6))
+            middle = len(name) // 2
+            queries.append(name[middle:middle + 3])
+        return [query for query in queries[:count] if query.strip()]
+
+    def time_queries(self, queries, search):
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    def measure(self, size, queries):
+        bump_version('ingredients')
+        start = time.perf_counter()
+        prefix_index.get_entries()
+        build = time.perf_counter() - start
+        modes = {
+            'icontains': lambda query: list(
+                Ingredient.objects.filter(name__icontains=query)
+            ),
+            'search': lambda query: list(
+                search_ingredients(Ingredient.objects.all(), query)
+            ),
+            'index': lambda query: prefix_index.search(query, 50),
+        }
+        self.stdout.write(
+            f'{size} строк, построение индекса {build * 1000:.0f} мс'
+        )
+        for mode, search in modes.items():
+            timings = self.time_queries(queries, search)
+            self.stdout.write(
+                f'  {mode:<10} p50 {percentile(timings, 0.5) * 1000:8.2f} мс'
+                f'  p99 {percentile(timings, 0.99) * 1000:8.2f} мс'
+                f'  среднее {statistics.mean(timings) * 1000:8.2f} мс'
+            )
+
+    def top_up(self, target, names):
+        count = Ingredient.objects.count()
+        batch = []
+        for name in names:
+            if count + len(batch) >= target:
+                break
+            batch.append(Ingredient(name=name, measurement_unit='г'))
+            if len(batch) == 10000:
+                Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+                count = Ingredient.objects.count()
+                batch = []
+        Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден.')
+        real = [
+            name.strip() for name, _ in read_csv(path)
+            if 0 < len(name.strip()) <= MAX_LENGTH
+        ]
+        queries = self.make_queries(real, options['queries'])
+        with rolled_back():
+            Ingredient.objects.bulk_create(
+                [Ingredient(name=name, measurement_unit='г')
+                 for name in real],
+                ignore_conflicts=True
+            )
+            names = synthetic_names(real, Ingredient.objects.count())
+            for size in sorted(options['sizes']):
+                self.top_up(size, names)
+                self.measure(Ingredient.objects.count(), queries)
+        bump_version('ingredients')
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.cache import bump_version
+from ingredients.models import Ingredient
+
+READ_SIZE = 64 * 1024
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        for row in csv.reader(file):
+            if len(row) >= 2 and row[:2] != ['name', 'measurement_unit']:
+                yield row[0], row[1]
+
+
+def read_json(path):
+    """Построчно разбирает JSON-массив объектов, не загружая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    with open(path, encoding='utf-8') as file:
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n[,]':
+                position += 1
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = file.read(READ_SIZE)
+                if not chunk:
+                    if buffer[position:].strip():
+                        raise CommandError(f'Некорректный JSON в {path}.')
+                    return
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield item['name'], item['measurement_unit']
+
+
+class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV- или JSON-файлов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Файлы .csv или .json.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке.'
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY даже на PostgreSQL.'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.max_length = Ingredient._meta.get_field('name').max_length
+        self.unit_max_length = Ingredient._meta.get_field(
+            'measurement_unit'
+        ).max_length
+        self.skipped = 0
+        use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        total_before = Ingredient.objects.count()
+        processed = 0
+        for path in options['paths']:
+            rows = self.clean(self.read(Path(path)))
+            with transaction.atomic():
+                if use_copy:
+                    processed += self.load_with_copy(rows, processed)
+                else:
+                    processed += self.load_with_bulk_create(rows, processed)
+        bump_version('ingredients')
+        created = Ingredient.objects.count() - total_before
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано строк: {processed}, добавлено: {created}, '
+            f'пропущено: {self.skipped}.'
+        ))
+
+    def read(self, path):
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден.')
+        if path.suffix == '.csv':
+            return read_csv(path)
+        if path.suffix == '.json':
+            return read_json(path)
+        raise CommandError(f'Неподдерживаемый формат файла: {path}.')
+
+    def clean(self, rows):
+        for name, measurement_unit in rows:
+            name = name.strip()
+            measurement_unit = measurement_unit.strip()
+            if (
+                not name or not measurement_unit
+                or len(name) > self.max_length
+                or len(measurement_unit) > self.unit_max_length
+            ):
+                self.skipped += 1
+                continue
+            yield name, measurement_unit
+
+    def batches(self, rows):
+        while batch := list(islice(rows, self.batch_size)):
+            yield batch
+
+    def report(self, processed):
+        self.stdout.write(f'Обработано строк: {processed}')
+
+    def load_with_bulk_create(self, rows, processed):
+        count = 0
+        for batch in self.batches(rows):
+            Ingredient.objects.bulk_create(
+                [
+                    Ingredient(name=name, measurement_unit=measurement_unit)
+                    for name, measurement_unit in batch
+                ],
+                ignore_conflicts=True
+            )
+            count += len(batch)
+            self.report(processed + count)
+        return count
+
+    def load_with_copy(self, rows, processed):
+        table = Ingredient._meta.db_table
+        count = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE ingredient_import '
+                '(name text, measurement_unit text) ON COMMIT DROP'
+            )
+            for batch in self.batches(rows):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    'COPY ingredient_import (name, measurement_unit) '
+                    'FROM STDIN WITH (FORMAT csv)',
+                    buffer
+                )
+                cursor.execute(
+                    f'INSERT INTO {table} (name, measurement_unit) '
+                    'SELECT name, measurement_unit FROM ingredient_import '
+                    'ON CONFLICT DO NOTHING'
+                )
+                cursor.execute('TRUNCATE ingredient_import')
+                count += len(batch)
+                self.report(processed + count)
+        return count
@@ -0,0 +1,92 @@
+from bisect import bisect_left, bisect_right
+from threading import Lock
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+
+from core.cache import get_version
+from core.constants import INGREDIENT_SEARCH_LIMIT
+from .models import Ingredient
+
+
+class IngredientPrefixIndex:
+    """Отсортированный индекс названий ингредиентов в памяти процесса.
+
+    Перестраивается, когда меняется версия 'ingredients' в кэше.
+    Для поиска по подстроке названия склеены в одну строку: str.find
+    просматривает ее на C, а позиция переводится в номер названия
+    бинарным поиском по смещениям.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._entries = ((), (), '', ())
+
+    def get_entries(self):
+        version = get_version('ingredients')
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    rows = sorted(
+                        (name.lower(), pk) for pk, name in
+                        Ingredient.objects.values_list('id', 'name')
+                    )
+                    names = tuple(name for name, _ in rows)
+                    offsets = []
+                    position = 0
+                    for name in names:
+                        offsets.append(position)
+                        position += len(name) + 1
+                    self._entries = (
+                        names,
+                        tuple(pk for _, pk in rows),
+                        '\n'.join(names),
+                        tuple(offsets)
+                    )
+                    self._version = version
+        return self._entries
+
+    def search(self, value, limit):
+        """Id ингредиентов: сперва по префиксу, затем по подстроке."""
+        names, ids, text, offsets = self.get_entries()
+        value = value.lower()
+        start = bisect_left(names, value)
+        end = bisect_left(names, value + '\U0010ffff', start)
+        result = list(ids[start:min(end, start + limit)])
+        if not value or '\n' in value:
+            return result
+        position = text.find(value)
+        while position != -1 and len(result) < limit:
+            number = bisect_right(offsets, position) - 1
+            if not start <= number < end:
+                result.append(ids[number])
+            if number + 1 == len(offsets):
+                break
+            position = text.find(value, offsets[number + 1])
+        return result
+
+
+prefix_index = IngredientPrefixIndex()
+
+
+def search_ingredients(queryset, value, limit=INGREDIENT_SEARCH_LIMIT):
+    """Поиск ингредиентов по названию с приоритетом совпадений по префиксу.
+
+    На PostgreSQL поиск обслуживает GIN-индекс pg_trgm, на остальных
+    базах используется индекс в памяти процесса.
+    """
+    if connection.vendor == 'postgresql':
+        return queryset.filter(name__icontains=value).annotate(
+            search_rank=Case(
+                When(name__istartswith=value, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField()
+            )
+        ).order_by('search_rank', 'name')[:limit]
+    ids = prefix_index.search(value, limit)
+    return queryset.filter(id__in=ids).order_by(Case(
+        *(When(id=pk, then=Value(position))
+          for position, pk in enumerate(ids)),
+        output_field=IntegerField()
+    ))
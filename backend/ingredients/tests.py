@@ -0,0 +1,31 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.constants import MAX_LENGTH
+from .models import Ingredient
+
+
+class LoadIngredientsTest(TestCase):
+    """Команда load_ingredients пропускает строки, не влезающие в поля."""
+
+    def test_skips_too_long_values(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'ingredients.csv'
+            path.write_text(
+                'соль,г\n'
+                'мука,ст. л.\n'
+                'оливки, фаршированные анчоусами,г\n'
+                f'{"а" * (MAX_LENGTH + 1)},г\n',
+                encoding='utf-8'
+            )
+            output = StringIO()
+            call_command('load_ingredients', str(path), stdout=output)
+        self.assertEqual(
+            sorted(Ingredient.objects.values_list('name', 'measurement_unit')),
+            [('мука', 'ст. л.'), ('соль', 'г')]
+        )
+        self.assertIn('пропущено: 2', output.getvalue())
@@ -0,0 +1,4 @@
+from core.reference import ReferenceIndex
+from .models import Ingredient
+
+ingredient_index = ReferenceIndex(Ingredient, 'ingredients')
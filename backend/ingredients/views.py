@@ -4,14 +4,16 @@ from rest_framework.permissions import AllowAny
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
 from core.filters import IngredientFilter
+from core.mixins import CachedListMixin
 from .models import Ingredient
 from .serializers import IngredientShortSerializer
 
 
-class IngredientViewSet(ReadOnlyModelViewSet):
+class IngredientViewSet(CachedListMixin, ReadOnlyModelViewSet):
     """Вьюсет для модели Ingredient."""
     queryset = Ingredient.objects.all()
     serializer_class = IngredientShortSerializer
     permission_classes = (AllowAny,)
+    cache_version_name = 'ingredients'
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_class = IngredientFilter
@@ -1,6 +1,5 @@
 from django.contrib import admin
 from django.utils.html import mark_safe
-from django.db.models import Count
 
 from .models import Recipe, RecipeIngredient
 
@@ -43,8 +42,4 @@ class RecipeAdmin(admin.ModelAdmin):
 
     @admin.display(description='Добавлено в избранное')
     def favorite_amount(self, obj):
-        return obj.favorite_amount
-
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        return queryset.annotate(favorite_amount=Count('favorites'))
+        return obj.favorites_count
@@ -0,0 +1,127 @@
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
+
+from core.constants import RECIPE_IMPORT_BATCH_SIZE
+from core.images import schedule_variants
+from core.utils import update_counter
+from core.workers import run_in_background
+from following.feed import push_recipes_to_feeds
+from .models import Recipe, RecipeIngredient
+from .serializers import RecipeImportSerializer
+from .utils import invalidate_recipes
+
+User = get_user_model()
+
+
+def parse_rows(lines):
+    """Разбирает строки NDJSON, пропуская пустые.
+
+    Возвращает пары (номер строки, данные или None при ошибке разбора).
+    """
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode()
+        if isinstance(line, str):
+            if not line.strip():
+                continue
+            try:
+                line = json.loads(line)
+            except ValueError:
+                line = None
+        yield number, line
+
+
+def validate_batch(rows):
+    """Проверяет строки пачки.
+
+    Теги и ингредиенты проверяются по справочникам в памяти процесса,
+    без запросов к базе на каждую строку.
+    """
+    valid = []
+    errors = {}
+    for number, data in rows:
+        if not isinstance(data, dict):
+            errors[number] = {'non_field_errors': ['Некорректный JSON.']}
+            continue
+        serializer = RecipeImportSerializer(data=data)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            errors[number] = serializer.errors
+    return valid, errors
+
+
+def create_batch(author, rows):
+    """Создает рецепты пачки тремя вставками bulk_create."""
+    recipes = []
+    for _, data in rows:
+        recipe = Recipe(
+            author=author,
+            name=data['name'],
+            text=data['text'],
+            cooking_time=data['cooking_time'],
+        )
+        image = data['image']
+        recipe.image.save(image.name, image, save=False)
+        recipes.append(recipe)
+    with transaction.atomic():
+        Recipe.objects.bulk_create(recipes)
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=item['id'],
+                amount=item['amount']
+            )
+            for recipe, (_, data) in zip(recipes, rows)
+            for item in data['ingredients']
+        ])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.id)
+            for recipe, (_, data) in zip(recipes, rows)
+            for tag in data['tags']
+        ])
+        # bulk_create не отправляет post_save, счетчик меняется явно.
+        update_counter(
+            User.objects.filter(pk=author.pk),
+            'recipes_count',
+            len(recipes)
+        )
+        invalidate_recipes(recipe_ids=[recipe.id for recipe in recipes])
+        for recipe in recipes:
+            schedule_variants(recipe.image)
+        recipe_ids = [recipe.id for recipe in recipes]
+        transaction.on_commit(lambda: run_in_background(
+            push_recipes_to_feeds, recipe_ids
+        ))
+    return recipes
+
+
+def import_recipes(author, lines, batch_size=RECIPE_IMPORT_BATCH_SIZE):
+    """Импортирует рецепты из строк NDJSON пачками.
+
+    Ошибка в строке не прерывает импорт: для каждой строки возвращается
+    либо id созданного рецепта, либо ошибки.
+    """
+    results = []
+    rows = parse_rows(lines)
+    while batch := list(islice(rows, batch_size)):
+        checked, errors = validate_batch(batch)
+        if checked:
+            try:
+                recipes = create_batch(author, checked)
+            except DatabaseError as error:
+                for number, _ in checked:
+                    errors[number] = {'non_field_errors': [str(error)]}
+            else:
+                results.extend(
+                    {'line': number, 'id': recipe.id}
+                    for (number, _), recipe in zip(checked, recipes)
+                )
+        results.extend(
+            {'line': number, 'errors': row_errors}
+            for number, row_errors in errors.items()
+        )
+    return sorted(results, key=lambda result: result['line'])
@@ -0,0 +1,145 @@
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+
+from core.benchmarks import BenchmarkCommand, percentile, rolled_back
+from core.cache import bump_version
+from core.filters import RecipeFilter
+from recipes.models import Recipe
+from tags.models import Tag
+
+User = get_user_model()
+
+BATCH_SIZE = 10000
+PAGE_SIZE = 6
+
+
+def filter_legacy(queryset, tags):
+    """Прежний фильтр: OR двух запросов с JOIN и DISTINCT."""
+    return queryset.filter(
+        tags__name__in=tags
+    ).distinct() | queryset.filter(
+        tags__slug__in=tags
+    ).distinct()
+
+
+def filter_exists(queryset, tags):
+    """Текущий фильтр RecipeFilter: EXISTS по промежуточной таблице."""
+    query = QueryDict(mutable=True)
+    query.setlist('tags', tags)
+    request = SimpleNamespace(query_params=query)
+    return RecipeFilter(query, queryset=queryset, request=request).qs
+
+
+MODES = {'legacy': filter_legacy, 'exists': filter_exists}
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Сравнивает фильтрацию рецептов по тегам через OR с DISTINCT и '
+        'через EXISTS: планы запросов и задержку COUNT и первой страницы. '
+        'Данные добавляются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=1000000,
+            help='Количество рецептов'
+        )
+        parser.add_argument(
+            '--tags',
+            type=int,
+            default=10,
+            help='Количество тегов'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Повторов каждого запроса'
+        )
+
+    def populate(self, recipes, tags):
+        tags = Tag.objects.bulk_create(
+            Tag(name=f'Тег {number}', slug=f'bench-tag-{number}')
+            for number in range(tags)
+        )
+        authors = User.objects.bulk_create(
+            User(
+                username=f'bench-author-{number}',
+                email=f'bench-author-{number}@example.com',
+                first_name='Автор',
+                last_name='Тестов',
+                password='!'
+            )
+            for number in range(100)
+        )
+        through = Recipe.tags.through
+        for start in range(0, recipes, BATCH_SIZE):
+            batch = Recipe.objects.bulk_create(
+                Recipe(
+                    author=authors[number % len(authors)],
+                    name=f'Рецепт {number}',
+                    text='Описание',
+                    cooking_time=number % 120 + 1,
+                    image='recipes/images/bench.png'
+                )
+                for number in range(start, min(start + BATCH_SIZE, recipes))
+            )
+            through.objects.bulk_create(
+                through(
+                    recipe_id=recipe.pk,
+                    tag_id=tags[(recipe.pk + offset * 3) % len(tags)].pk
+                )
+                for recipe in batch
+                for offset in range(recipe.pk % 3 + 1)
+            )
+        self.stdout.write(
+            f'Рецептов: {recipes}, тегов: {len(tags)}, '
+            f'связей: {through.objects.count()}'
+        )
+        return [tag.slug for tag in tags]
+
+    def timed(self, func):
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    def report(self, label, timings):
+        self.stdout.write(
+            f'    {label:<6} p50 {percentile(timings, 0.5) * 1000:9.1f} мс'
+            f'  среднее {statistics.mean(timings) * 1000:9.1f} мс'
+        )
+
+    def measure(self, slugs):
+        for count in (1, 3, 5):
+            tags = slugs[:count]
+            self.stdout.write(f'Тегов в фильтре: {count}')
+            for mode, filter_tags in MODES.items():
+                queryset = filter_tags(Recipe.objects.all(), tags)
+                self.stdout.write(f'  {mode}')
+                self.report('count', self.timed(queryset.count))
+                self.report('page', self.timed(
+                    lambda: list(queryset[:PAGE_SIZE])
+                ))
+        self.stdout.write('Планы первой страницы, 3 тега:')
+        for mode, filter_tags in MODES.items():
+            queryset = filter_tags(Recipe.objects.all(), slugs[:3])
+            self.stdout.write(f'  {mode}:')
+            for line in queryset[:PAGE_SIZE].explain().splitlines():
+                self.stdout.write(f'    {line}')
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        with rolled_back():
+            slugs = self.populate(options['recipes'], options['tags'])
+            bump_version('tags')
+            self.measure(slugs)
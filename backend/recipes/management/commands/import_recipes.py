@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core.constants import RECIPE_IMPORT_BATCH_SIZE
+from recipes.importer import import_recipes
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Импортирует рецепты из файла NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу NDJSON')
+        parser.add_argument(
+            '--author',
+            required=True,
+            help='Имя пользователя или email автора рецептов'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RECIPE_IMPORT_BATCH_SIZE,
+            help='Количество рецептов в одной пачке'
+        )
+
+    def handle(self, *args, **options):
+        author = User.objects.filter(
+            Q(username=options['author']) | Q(email=options['author'])
+        ).first()
+        if author is None:
+            raise CommandError(f'Автор {options["author"]} не найден.')
+        with open(options['path'], encoding='utf-8') as file:
+            results = import_recipes(author, file, options['batch_size'])
+        created = 0
+        for result in results:
+            if 'id' in result:
+                created += 1
+            else:
+                self.stderr.write(
+                    f'Строка {result["line"]}: {result["errors"]}'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано рецептов: {created}, с ошибками: '
+            f'{len(results) - created}.'
+        ))
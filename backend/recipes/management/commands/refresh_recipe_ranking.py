@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from recipes.ranking import refresh_ranking
+
+
+class Command(BaseCommand):
+    help = 'Обновляет рейтинг рецептов для сортировки popular и trending.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать рейтинг всех рецептов, а не только измененных.'
+        )
+
+    def handle(self, *args, **options):
+        updated = refresh_ranking(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено рецептов в рейтинге: {updated}.'
+        ))
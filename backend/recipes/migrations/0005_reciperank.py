@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_favorites_count_recipe_in_carts_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeRank',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rank', serialize=False, to='recipes.recipe', verbose_name='Рецепт')),
+                ('popular_score', models.FloatField(db_index=True, default=0, verbose_name='Популярность')),
+                ('trending_score', models.FloatField(db_index=True, default=0, verbose_name='Популярность с затуханием')),
+                ('refreshed_at', models.DateTimeField(db_index=True, verbose_name='Обновлен')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг рецепта',
+                'verbose_name_plural': 'Рейтинги рецептов',
+            },
+        ),
+    ]
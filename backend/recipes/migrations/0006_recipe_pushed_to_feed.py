@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_reciperank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='pushed_to_feed',
+            field=models.BooleanField(default=False, verbose_name='Разослан в ленты подписчиков'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:07
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_recipe_pushed_to_feed'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(default=None, storage=core.storage.ContentAddressedStorage(), upload_to='recipes/images/'),
+        ),
+    ]
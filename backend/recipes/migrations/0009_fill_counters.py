@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total'),
+        output_field=IntegerField()
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    recipe = apps.get_model('recipes', 'Recipe')
+    favorite = apps.get_model('favorite', 'Favorite')
+    shopping_cart = apps.get_model('shopping_cart', 'ShoppingCart')
+    recipe.objects.update(
+        favorites_count=count_of(favorite, 'recipe'),
+        in_carts_count=count_of(shopping_cart, 'recipe')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_alter_recipe_image'),
+        ('favorite', '0003_initial'),
+        ('shopping_cart', '0003_shoppinglistjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_fill_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('pushed_to_feed', False)), fields=['author', '-created_at', '-id'], name='recipe_unpushed_idx'),
+        ),
+    ]
@@ -1,8 +1,11 @@
+from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import BooleanField, Exists, OuterRef, Prefetch, Value
 
 from core.constants import MAX_LENGTH, MAX_TITLE_LENGTH
+from core.storage import image_storage
 from core.validators import validate_amount
 from ingredients.models import Ingredient
 from tags.models import Tag
@@ -10,6 +13,46 @@ from tags.models import Tag
 User = get_user_model()
 
 
+class RecipeQuerySet(models.QuerySet):
+    """Построитель запросов для выдачи рецептов без N+1."""
+
+    def with_related(self):
+        """Подгружает автора, теги и ингредиенты рецептов."""
+        return self.select_related('author').prefetch_related(
+            'tags',
+            Prefetch(
+                'amount_ingredients',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
+
+    def with_user_flags(self, user):
+        """Аннотирует флаги избранного, списка покупок и подписки."""
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField()),
+                author_is_subscribed=Value(False, output_field=BooleanField())
+            )
+        favorite = apps.get_model('favorite', 'Favorite')
+        shopping_cart = apps.get_model('shopping_cart', 'ShoppingCart')
+        follow = apps.get_model('following', 'Follow')
+        return self.annotate(
+            is_favorited=Exists(
+                favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                shopping_cart.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            author_is_subscribed=Exists(
+                follow.objects.filter(
+                    user=user,
+                    following=OuterRef('author')
+                )
+            )
+        )
+
+
 class Recipe(models.Model):
     """Модель Рецептов."""
     name = models.CharField(
@@ -33,6 +76,7 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         upload_to='recipes/images/',
+        storage=image_storage,
         default=None
     )
     tags = models.ManyToManyField(
@@ -44,11 +88,36 @@ class Recipe(models.Model):
         through='RecipeIngredient',
         verbose_name='Ингредиенты'
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Добавлено в избранное'
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Добавлено в списки покупок'
+    )
+    pushed_to_feed = models.BooleanField(
+        default=False,
+        verbose_name='Разослан в ленты подписчиков'
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='recipe_created_at_id_idx'
+            ),
+            models.Index(
+                fields=['author', '-created_at', '-id'],
+                condition=models.Q(pushed_to_feed=False),
+                name='recipe_unpushed_idx'
+            )
+        ]
 
     def __str__(self):
         return self.name[:MAX_LENGTH]
@@ -80,3 +149,35 @@ class RecipeIngredient(models.Model):
 
     def __str__(self):
         return f'{self.recipe.name}/{self.ingredient.name}'
+
+
+class RecipeRank(models.Model):
+    """Предрассчитанный рейтинг популярности рецепта."""
+    recipe = models.OneToOneField(
+        Recipe,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='rank',
+        verbose_name='Рецепт'
+    )
+    popular_score = models.FloatField(
+        default=0,
+        db_index=True,
+        verbose_name='Популярность'
+    )
+    trending_score = models.FloatField(
+        default=0,
+        db_index=True,
+        verbose_name='Популярность с затуханием'
+    )
+    refreshed_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='Обновлен'
+    )
+
+    class Meta:
+        verbose_name = 'Рейтинг рецепта'
+        verbose_name_plural = 'Рейтинги рецептов'
+
+    def __str__(self):
+        return f'{self.recipe} ({self.popular_score}/{self.trending_score})'
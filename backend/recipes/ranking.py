@@ -0,0 +1,126 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from core.constants import (RANKING_BATCH_SIZE, RANKING_CART_WEIGHT,
+                            RANKING_EPOCH, RANKING_FAVORITE_WEIGHT,
+                            RANKING_HALF_LIFE_DAYS,
+                            RANKING_REFRESH_OVERLAP_MINUTES)
+from .models import Recipe, RecipeRank
+
+EPOCH = datetime.fromisoformat(RANKING_EPOCH)
+HALF_LIFE = timedelta(days=RANKING_HALF_LIFE_DAYS).total_seconds()
+
+
+def decayed_weight(weight, created_at):
+    """Вес события, растущий вдвое за каждый период полураспада.
+
+    Умножение всех оценок на общий множитель не меняет их порядок,
+    поэтому вместо затухания старых событий растет вес новых, и новые
+    события можно добавлять к сохраненной оценке.
+    """
+    return weight * 2 ** ((created_at - EPOCH).total_seconds() / HALF_LIFE)
+
+
+def get_event_sources():
+    return (
+        (apps.get_model('favorite', 'Favorite'), RANKING_FAVORITE_WEIGHT),
+        (apps.get_model('shopping_cart', 'ShoppingCart'), RANKING_CART_WEIGHT),
+    )
+
+
+def collect_trending_scores(recipe_ids=None):
+    """Суммирует веса всех добавлений рецептов в избранное и в корзину.
+
+    Оценка считается заново по всем событиям рецепта, поэтому повторный
+    просмотр события ничего не удваивает, а удаленное событие просто
+    перестает учитываться.
+    """
+    scores = defaultdict(float)
+    for model, weight in get_event_sources():
+        events = model.objects.all()
+        if recipe_ids is not None:
+            events = events.filter(recipe_id__in=recipe_ids)
+        for recipe_id, created_at in events.values_list(
+            'recipe_id', 'created_at'
+        ).iterator():
+            scores[recipe_id] += decayed_weight(weight, created_at)
+    return scores
+
+
+def get_popular_score():
+    return (
+        F('favorites_count') * RANKING_FAVORITE_WEIGHT
+        + F('in_carts_count') * RANKING_CART_WEIGHT
+    )
+
+
+def get_changed_recipe_ids(since):
+    """Рецепты, чья оценка могла измениться с момента since.
+
+    Кроме событий новее since берутся рецепты, у которых счетчики
+    разошлись с сохраненной popular_score: так находятся удаления из
+    избранного и корзины, а также события, зафиксированные позже
+    предыдущего запуска, но с более ранним created_at.
+    """
+    recipe_ids = set()
+    for model, _ in get_event_sources():
+        recipe_ids.update(model.objects.filter(
+            created_at__gte=since
+        ).values_list('recipe_id', flat=True))
+    recipe_ids.update(
+        Recipe.objects.alias(score=get_popular_score()).filter(
+            Q(rank__isnull=True, score__gt=0)
+            | Q(rank__isnull=False) & ~Q(rank__popular_score=F('score'))
+        ).values_list('id', flat=True)
+    )
+    return recipe_ids
+
+
+def refresh_ranking(full=False):
+    """Обновляет таблицу рейтинга и возвращает число обновленных рецептов.
+
+    Инкрементальное обновление пересчитывает только рецепты из
+    get_changed_recipe_ids, захватывая события за
+    RANKING_REFRESH_OVERLAP_MINUTES до предыдущего запуска: транзакция,
+    начатая до него, могла зафиксироваться позже.
+    """
+    started_at = timezone.now()
+    last = None
+    if not full:
+        last = RecipeRank.objects.aggregate(
+            last=Max('refreshed_at')
+        )['last']
+    if last is None:
+        recipes = Recipe.objects.all()
+        scores = collect_trending_scores()
+    else:
+        recipe_ids = get_changed_recipe_ids(
+            last - timedelta(minutes=RANKING_REFRESH_OVERLAP_MINUTES)
+        )
+        recipes = Recipe.objects.filter(id__in=recipe_ids)
+        scores = collect_trending_scores(recipe_ids)
+    ranks = [
+        RecipeRank(
+            recipe_id=recipe_id,
+            popular_score=popular_score,
+            trending_score=scores.get(recipe_id, 0),
+            refreshed_at=started_at
+        )
+        for recipe_id, popular_score in recipes.annotate(
+            popular_score=get_popular_score()
+        ).values_list('id', 'popular_score').iterator()
+    ]
+    with transaction.atomic():
+        RecipeRank.objects.bulk_create(
+            ranks,
+            batch_size=RANKING_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=('recipe',),
+            update_fields=('popular_score', 'trending_score', 'refreshed_at')
+        )
+    return len(ranks)
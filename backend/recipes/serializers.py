@@ -1,16 +1,21 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from core.fields import Base64ImageField
+from core.fields import (Base64ImageField, ImageVariantsField,
+                         ReferenceListField)
+from core.workers import run_in_background
 from favorite.models import Favorite
+from following.feed import push_recipe_to_feeds
 from recipes.models import Recipe, RecipeIngredient
 from shopping_cart.models import ShoppingCart
-from tags.models import Tag
+from shopping_cart.utils import invalidate_recipe_shopping_carts
 from tags.serializers import TagSerializer
+from tags.utils import tag_index
 from users.serializers import UserSerializer
 from core.constants import MIN_COOK_TIME, MAX_COOK_TIME
-from ingredients.models import Ingredient
+from ingredients.utils import ingredient_index
 
 User = get_user_model()
 
@@ -53,6 +58,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     )
     author = UserSerializer(read_only=True)
     image = Base64ImageField(required=True, allow_null=False)
+    image_variants = ImageVariantsField(source='image')
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
 
@@ -65,6 +71,7 @@ class RecipeSerializer(serializers.ModelSerializer):
             'text',
             'cooking_time',
             'image',
+            'image_variants',
             'tags',
             'ingredients',
             'is_favorited',
@@ -72,6 +79,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         return (
             request.user.is_authenticated
@@ -83,6 +92,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         request = self.context.get('request')
         return (
             request.user.is_authenticated
@@ -93,25 +104,30 @@ class RecipeSerializer(serializers.ModelSerializer):
             if request else False
         )
 
+    def to_representation(self, instance):
+        if hasattr(instance, 'author_is_subscribed'):
+            instance.author.is_subscribed = instance.author_is_subscribed
+        return super().to_representation(instance)
+
 
 class RecipeShortSerializer(serializers.ModelSerializer):
     """Упрощенный сериализатор рецепта."""
+    image_variants = ImageVariantsField(source='image')
+
     class Meta:
         model = Recipe
         fields = (
             'id',
             'name',
             'image',
+            'image_variants',
             'cooking_time'
         )
 
 
 class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
     """Сериализатор для обновления и создания рецепта."""
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(),
-        many=True
-    )
+    tags = ReferenceListField(index=tag_index)
     author = UserSerializer(read_only=True)
     ingredients = RecipeIngredientUpdateSerializer(many=True)
     image = Base64ImageField(required=True)
@@ -133,7 +149,8 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
             'cooking_time',
         )
 
-    def validate_ingredients(self, ingredients):
+    def check_ingredients(self, ingredients):
+        """Проверки списка ингредиентов, не требующие запросов к базе."""
         if not ingredients:
             raise serializers.ValidationError(
                 'Укажите хотя бы один ингредиент.'
@@ -143,22 +160,21 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Ингредиенты не могут повторяться.'
             )
-        existing_ingredient_ids = set(
-            Ingredient.objects.filter(id__in=ingredient_ids).values_list(
-                'id',
-                flat=True
-            )
-        )
-        for ingredient_data in ingredients:
-            if ingredient_data['id'] not in existing_ingredient_ids:
-                raise serializers.ValidationError(
-                    f'Ингредиент с id={ingredient_data["id"]} не найден.'
-                )
         for ingredient in ingredients:
             if int(ingredient.get('amount', 0)) <= 0:
                 raise serializers.ValidationError(
                     'Количество ингредиента должно быть больше 0.'
                 )
+        return ingredient_ids
+
+    def validate_ingredients(self, ingredients):
+        ingredient_ids = self.check_ingredients(ingredients)
+        _, missing = ingredient_index.resolve(ingredient_ids)
+        for ingredient_id in ingredient_ids:
+            if ingredient_id in missing:
+                raise serializers.ValidationError(
+                    f'Ингредиент с id={ingredient_id} не найден.'
+                )
         return ingredients
 
     def validate_tags(self, tags):
@@ -182,9 +198,13 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
-        recipe = Recipe.objects.create(**validated_data)
-        recipe.tags.set(tags)
-        self.create_ingredients(ingredients, recipe)
+        with transaction.atomic():
+            recipe = Recipe.objects.create(**validated_data)
+            recipe.tags.set(tags)
+            self.create_ingredients(ingredients, recipe)
+        transaction.on_commit(
+            lambda: run_in_background(push_recipe_to_feeds, recipe.id)
+        )
         return recipe
 
     def update(self, instance, validated_data):
@@ -194,14 +214,69 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
             raise ValidationError('Теги обязательны для обновления.')
         if ingredients is None or not ingredients:
             raise ValidationError('Ингредиенты обязательны для обновления.')
-        instance.tags.set(tags)
-        instance.amount_ingredients.all().delete()
-        self.create_ingredients(ingredients, instance)
-        super().update(instance, validated_data)
+        with transaction.atomic():
+            self.update_tags(instance, tags)
+            ingredients_changed = self.update_ingredients(
+                instance, ingredients
+            )
+            super().update(instance, validated_data)
+        if ingredients_changed:
+            invalidate_recipe_shopping_carts(instance.id)
         return instance
 
+    def update_tags(self, instance, tags):
+        """Меняет теги рецепта, только если их набор изменился."""
+        tag_ids = {tag.id for tag in tags}
+        current_ids = set(instance.tags.values_list('id', flat=True))
+        if tag_ids != current_ids:
+            instance.tags.set(tag_ids)
+
+    def update_ingredients(self, instance, ingredients):
+        """Приводит ингредиенты рецепта к новому списку по разнице.
+
+        Меняются только строки с другим количеством, добавляются новые
+        и удаляются убранные ингредиенты. Возвращает True, если что-то
+        изменилось.
+        """
+        current = {
+            item.ingredient_id: item
+            for item in instance.amount_ingredients.all()
+        }
+        changed = []
+        added = []
+        for ingredient in ingredients:
+            item = current.pop(ingredient['id'], None)
+            if item is None:
+                added.append(ingredient)
+            elif item.amount != ingredient['amount']:
+                item.amount = ingredient['amount']
+                changed.append(item)
+        if current:
+            RecipeIngredient.objects.filter(
+                pk__in=[item.pk for item in current.values()]
+            ).delete()
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ('amount',))
+        if added:
+            self.create_ingredients(added, instance)
+        return bool(current or changed or added)
+
     def to_representation(self, instance):
         return RecipeSerializer(
             instance,
             context={'request': self.context.get('request')}
         ).data
+
+
+class RecipeImportSerializer(RecipeCreateUpdateSerializer):
+    """Сериализатор строки массового импорта рецептов."""
+
+    class Meta(RecipeCreateUpdateSerializer.Meta):
+        fields = (
+            'tags',
+            'ingredients',
+            'name',
+            'image',
+            'text',
+            'cooking_time',
+        )
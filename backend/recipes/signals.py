@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+from django.dispatch import receiver
+
+from core.images import (release_replaced_image, remember_image,
+                         schedule_release, schedule_variants)
+from core.utils import update_counter
+from .models import Recipe, RecipeIngredient
+from .utils import invalidate_authors, invalidate_recipes
+
+
+@receiver(post_init, sender=Recipe)
+def recipe_loaded(sender, instance, **kwargs):
+    remember_image(instance, 'image')
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        update_counter(
+            get_user_model().objects.filter(pk=instance.author_id),
+            'recipes_count',
+            1
+        )
+    release_replaced_image(instance, 'image')
+    schedule_variants(instance.image)
+    invalidate_recipes(recipe_ids=(instance.pk,))
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    update_counter(
+        get_user_model().objects.filter(pk=instance.author_id),
+        'recipes_count',
+        -1
+    )
+    schedule_release(instance.image.name)
+    invalidate_recipes(recipe_ids=(instance.pk,))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        invalidate_recipes(recipe_ids=pk_set or ())
+    else:
+        invalidate_recipes(recipe_ids=(instance.pk,))
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def recipe_ingredient_changed(sender, instance, **kwargs):
+    invalidate_recipes(recipe_ids=(instance.recipe_id,))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def author_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_authors(instance.pk)
@@ -0,0 +1,486 @@
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.cache import get_version
+from core.testing import (TEST_CACHES, TempMediaMixin, create_recipe,
+                          create_user, make_data_url)
+from favorite.models import Favorite
+from ingredients.models import Ingredient
+from ingredients.utils import ingredient_index
+from shopping_cart.models import ShoppingCart
+from shopping_cart.utils import get_cart_version
+from tags.models import Tag
+from tags.utils import tag_index
+from . import importer
+from .models import Recipe, RecipeIngredient, RecipeRank
+from .ranking import refresh_ranking
+from .utils import RECIPES_CACHE_TAG, get_author_cache_tag
+
+# Рецепты, автор (select_related), count, ингредиенты и теги.
+RECIPE_LIST_QUERIES = 4
+# Обновление без изменений состава: рецепт и автор, SAVEPOINT, текущие
+# теги и ингредиенты, UPDATE рецепта, RELEASE. Ответ: подписка, теги,
+# ингредиенты, по запросу на каждый из двух ингредиентов, избранное и
+# список покупок.
+RECIPE_UPDATE_QUERIES = 14
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RecipeListQueriesTest(APITestCase):
+    """Число запросов списка рецептов не зависит от размера страницы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('reader')
+        tags = Tag.objects.bulk_create(
+            Tag(name=f'Тег {number}', slug=f'tag-{number}')
+            for number in range(3)
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(5)
+        )
+        for number in range(20):
+            recipe = create_recipe(
+                create_user(f'author{number}'), f'Рецепт {number}'
+            )
+            recipe.tags.set(tags[:number % 3 + 1])
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe=recipe,
+                    ingredient=ingredient,
+                    amount=number + 1
+                )
+                for ingredient in ingredients[:number % 5 + 1]
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_constant_queries(self):
+        for limit in (2, 20):
+            with self.subTest(limit=limit):
+                with self.assertNumQueries(RECIPE_LIST_QUERIES):
+                    response = self.client.get(
+                        '/api/recipes/', {'limit': limit}
+                    )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['results']), limit)
+
+    def test_anonymous_list_queries(self):
+        self.assert_constant_queries()
+
+    def test_authenticated_list_queries(self):
+        self.client.force_authenticate(self.user)
+        self.assert_constant_queries()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RecipeCursorPaginationTest(APITestCase):
+    """Пагинация по курсору включается флагом и не теряет строк."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_user('author')
+        now = timezone.now()
+        for number in range(5):
+            recipe = create_recipe(self.author, f'Рецепт {number}')
+            # Пары рецептов с одинаковым временем: порядок решает id.
+            Recipe.objects.filter(pk=recipe.pk).update(
+                created_at=now - timedelta(minutes=number // 2)
+            )
+        self.client.force_authenticate(self.author)
+
+    def get_expected(self):
+        return list(Recipe.objects.order_by(
+            '-created_at', '-id'
+        ).values_list('id', flat=True))
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
+        data = response.json()
+        self.assertNotIn('count', data)
+        return data
+
+    def walk(self, url):
+        seen = []
+        while url:
+            data = self.get(url)
+            seen += [recipe['id'] for recipe in data['results']]
+            url = data['next']
+            if url:
+                self.assertIn('pagination=cursor', url)
+        return seen
+
+    def test_pages_cover_all_recipes(self):
+        self.assertEqual(
+            self.walk('/api/recipes/?pagination=cursor&limit=2'),
+            self.get_expected()
+        )
+
+    def test_previous_page(self):
+        first = self.get('/api/recipes/?pagination=cursor&limit=2')
+        second = self.get(first['next'])
+        self.assertEqual(self.get(second['previous'])['results'],
+                         first['results'])
+
+    def test_new_recipe_does_not_shift_pages(self):
+        expected = self.get_expected()
+        first = self.get('/api/recipes/?pagination=cursor&limit=2')
+        with self.captureOnCommitCallbacks(execute=True):
+            create_recipe(self.author, 'Новый рецепт')
+        seen = [recipe['id'] for recipe in first['results']]
+        self.assertEqual(seen + self.walk(first['next']), expected)
+
+    def test_page_number_by_default(self):
+        response = self.client.get('/api/recipes/', {'limit': 2})
+        self.assertEqual(response.json()['count'], 5)
+
+
+class RecipeCounterTest(APITestCase):
+    """Счетчик рецептов автора меняется при любом создании и удалении."""
+
+    def setUp(self):
+        self.author = create_user('author')
+
+    def test_orm_create_and_delete(self):
+        recipe = create_recipe(self.author)
+        create_recipe(self.author)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 2)
+        recipe.delete()
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 1)
+
+    def test_api_delete(self):
+        recipe = create_recipe(self.author)
+        self.client.force_authenticate(self.author)
+        response = self.client.delete(f'/api/recipes/{recipe.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 0)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RecipeCacheHeadersTest(APITestCase):
+    """Last-Modified есть только у кэшированных ответов retrieve."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recipe = create_recipe(create_user('author'))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_has_etag_only(self):
+        response = self.client.get('/api/recipes/')
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_detail_has_last_modified(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_author_change_keeps_other_lists(self):
+        author = self.recipe.author
+        url = f'/api/recipes/{self.recipe.pk}/'
+        etag = self.client.get(url)['ETag']
+        versions = (
+            get_version(RECIPES_CACHE_TAG),
+            get_version(get_author_cache_tag(author.pk))
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            create_user('newcomer')
+            author.first_name = 'Новое'
+            author.save()
+        self.assertEqual(get_version(RECIPES_CACHE_TAG), versions[0])
+        self.assertNotEqual(
+            get_version(get_author_cache_tag(author.pk)), versions[1]
+        )
+        response = self.client.get(url)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['author']['first_name'], 'Новое')
+
+
+class RecipeRankingTest(APITestCase):
+    """Инкрементальный пересчет рейтинга не теряет изменений."""
+
+    def setUp(self):
+        self.user = create_user('reader')
+        self.recipe = create_recipe(create_user('author'))
+        create_recipe(self.recipe.author, 'Другой рецепт')
+        refresh_ranking(full=True)
+
+    def get_rank(self):
+        return RecipeRank.objects.get(recipe=self.recipe)
+
+    def test_late_committed_event(self):
+        favorite = Favorite.objects.create(
+            user=self.user, recipe=self.recipe
+        )
+        Favorite.objects.filter(pk=favorite.pk).update(
+            created_at=self.get_rank().refreshed_at - timedelta(days=1)
+        )
+        self.assertEqual(refresh_ranking(), 1)
+        rank = self.get_rank()
+        self.assertEqual(rank.popular_score, 1)
+        self.assertGreater(rank.trending_score, 0)
+
+    def test_removed_event(self):
+        favorite = Favorite.objects.create(
+            user=self.user, recipe=self.recipe
+        )
+        refresh_ranking()
+        self.assertEqual(self.get_rank().popular_score, 1)
+        favorite.delete()
+        refresh_ranking()
+        rank = self.get_rank()
+        self.assertEqual(rank.popular_score, 0)
+        self.assertEqual(rank.trending_score, 0)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RecipeImportTest(TempMediaMixin, APITestCase):
+    """Массовый импорт: ошибки строк не мешают остальным рецептам."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.author = create_user('author')
+        self.tag = Tag.objects.create(name='Обед', slug='lunch')
+        self.ingredient = Ingredient.objects.create(
+            name='Мука', measurement_unit='г'
+        )
+        self.image = make_data_url()
+
+    def make_row(self, name, ingredient_id=None):
+        return {
+            'name': name,
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': self.image,
+            'tags': [self.tag.pk],
+            'ingredients': [{
+                'id': ingredient_id or self.ingredient.pk,
+                'amount': 200,
+            }],
+        }
+
+    def make_lines(self):
+        return [
+            json.dumps(self.make_row('Первый')),
+            '{"name": ',
+            json.dumps(self.make_row('Без ингредиента', 10 ** 6)),
+            '',
+            json.dumps(self.make_row('Второй')),
+        ]
+
+    def assert_recipes_count(self, count):
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, count)
+        self.assertEqual(
+            Recipe.objects.filter(author=self.author).count(), count
+        )
+
+    def test_partial_success(self):
+        self.client.force_authenticate(self.author)
+        response = self.client.post(
+            '/api/recipes/bulk/',
+            '\n'.join(self.make_lines()),
+            content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data['created'], data['failed']), (2, 2))
+        self.assertEqual(
+            [(result['line'], 'id' in result) for result in data['results']],
+            [(1, True), (2, False), (3, False), (5, True)]
+        )
+        self.assertIn('ingredients', data['results'][2]['errors'])
+        self.assert_recipes_count(2)
+        recipe = Recipe.objects.get(pk=data['results'][0]['id'])
+        self.assertEqual(list(recipe.tags.all()), [self.tag])
+        self.assertEqual(
+            list(recipe.amount_ingredients.values_list(
+                'ingredient_id', 'amount'
+            )),
+            [(self.ingredient.pk, 200)]
+        )
+
+    def test_all_rows_invalid(self):
+        self.client.force_authenticate(self.author)
+        response = self.client.post(
+            '/api/recipes/bulk/',
+            [self.make_row('', 10 ** 6)],
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['created'], 0)
+        self.assert_recipes_count(0)
+
+    def test_failed_batch(self):
+        create_batch = importer.create_batch
+        calls = []
+
+        def fail_first_batch(author, rows):
+            calls.append(rows)
+            if len(calls) == 1:
+                raise DatabaseError('Сбой вставки')
+            return create_batch(author, rows)
+
+        with mock.patch.object(importer, 'create_batch', fail_first_batch):
+            results = importer.import_recipes(
+                self.author, self.make_lines(), batch_size=1
+            )
+        self.assertEqual(results[0], {
+            'line': 1, 'errors': {'non_field_errors': ['Сбой вставки']}
+        })
+        self.assertIn('id', results[-1])
+        self.assert_recipes_count(1)
+
+    def test_command(self):
+        fd, path = tempfile.mkstemp(suffix='.ndjson')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(self.make_lines()))
+        stdout = io.StringIO()
+        call_command(
+            'import_recipes', path, author=self.author.username,
+            stdout=stdout, stderr=io.StringIO()
+        )
+        self.assertIn('Создано рецептов: 2, с ошибками: 2.', stdout.getvalue())
+        self.assert_recipes_count(2)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RecipeUpdateTest(APITestCase):
+    """Обновление меняет только отличающиеся ингредиенты и теги."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_user('author')
+        self.recipe = create_recipe(self.author)
+        self.tags = Tag.objects.bulk_create(
+            Tag(name=f'Тег {number}', slug=f'tag-{number}')
+            for number in range(3)
+        )
+        self.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(3)
+        )
+        self.recipe.tags.set(self.tags[:2])
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=self.recipe, ingredient=ingredient,
+                             amount=100)
+            for ingredient in self.ingredients[:2]
+        )
+        ShoppingCart.objects.create(user=self.author, recipe=self.recipe)
+        tag_index.get_objects()
+        ingredient_index.get_objects()
+        self.client.force_authenticate(self.author)
+
+    def patch(self, tags, ingredients):
+        return self.client.patch(
+            f'/api/recipes/{self.recipe.pk}/',
+            {
+                'name': 'Новое название',
+                'tags': [tag.pk for tag in tags],
+                'ingredients': [
+                    {'id': ingredient.pk, 'amount': amount}
+                    for ingredient, amount in ingredients
+                ],
+            },
+            format='json'
+        )
+
+    def get_rows(self):
+        return (
+            dict(self.recipe.amount_ingredients.values_list(
+                'ingredient_id', 'pk'
+            )),
+            dict(Recipe.tags.through.objects.filter(
+                recipe=self.recipe
+            ).values_list('tag_id', 'pk')),
+        )
+
+    def test_unchanged_rows_kept(self):
+        rows = self.get_rows()
+        version = get_cart_version(self.author.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.patch(
+                    self.tags[:2],
+                    [(ingredient, 100) for ingredient in self.ingredients[:2]]
+                )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), RECIPE_UPDATE_QUERIES)
+        self.assertEqual(
+            [
+                query['sql'].split()[:2] for query in queries
+                if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+            ],
+            [['UPDATE', '"recipes_recipe"']]
+        )
+        self.assertEqual(response.json()['name'], 'Новое название')
+        self.assertEqual(self.get_rows(), rows)
+        self.assertEqual(get_cart_version(self.author.id), version)
+
+    def test_unknown_references(self):
+        missing = Ingredient(pk=10 ** 6)
+        response = self.patch(
+            [self.tags[0], Tag(pk=10 ** 6)], [(missing, 100)]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {
+            'tags': [f'Недопустимый первичный ключ "{10 ** 6}" - '
+                     'объект не существует.'],
+            'ingredients': [f'Ингредиент с id={10 ** 6} не найден.'],
+        })
+        self.assertEqual(self.recipe.tags.count(), 2)
+
+    def test_changed_rows(self):
+        ingredient_rows, tag_rows = self.get_rows()
+        first, second, third = self.ingredients
+        version = get_cart_version(self.author.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.patch(
+                self.tags[1:], [(first, 150), (third, 50)]
+            )
+        self.assertEqual(response.status_code, 200)
+        new_ingredient_rows, new_tag_rows = self.get_rows()
+        self.assertEqual(set(new_ingredient_rows), {first.pk, third.pk})
+        self.assertEqual(
+            new_ingredient_rows[first.pk], ingredient_rows[first.pk]
+        )
+        self.assertEqual(
+            dict(self.recipe.amount_ingredients.values_list(
+                'ingredient_id', 'amount'
+            )),
+            {first.pk: 150, third.pk: 50}
+        )
+        kept_tag = self.tags[1].pk
+        self.assertEqual(set(new_tag_rows), {kept_tag, self.tags[2].pk})
+        self.assertEqual(new_tag_rows[kept_tag], tag_rows[kept_tag])
+        self.assertNotEqual(get_cart_version(self.author.id), version)
@@ -0,0 +1,33 @@
+from django.db import transaction
+
+from core.cache import bump_version
+
+RECIPES_CACHE_TAG = 'recipes'
+
+
+def get_recipe_cache_tag(recipe_id):
+    return f'recipe:{recipe_id}'
+
+
+def get_author_cache_tag(user_id):
+    return f'author:{user_id}'
+
+
+def invalidate_recipes(recipe_ids=()):
+    """Сбрасывает кэш ответов с рецептами после фиксации транзакции."""
+    names = (
+        RECIPES_CACHE_TAG,
+        *(get_recipe_cache_tag(recipe_id) for recipe_id in recipe_ids),
+    )
+    transaction.on_commit(lambda: bump_version(*names))
+
+
+def invalidate_authors(*user_ids):
+    """Сбрасывает только ответы с рецептами этих авторов.
+
+    Состав списков от данных автора не зависит, поэтому общую версию
+    RECIPES_CACHE_TAG менять не нужно: списки и карточки с рецептами
+    автора хранят версию его тега.
+    """
+    names = tuple(get_author_cache_tag(user_id) for user_id in user_ids)
+    transaction.on_commit(lambda: bump_version(*names))
@@ -3,20 +3,28 @@ from django.contrib.auth import get_user_model
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from core.filters import RecipeFilter
-from core.paginators import CustomPagination
+from core.mixins import AnonymousCacheMixin
+from core.paginators import (CustomPagination, KeysetPagination,
+                             RecipeCursorPagination)
+from core.parsers import NDJSONParser
 from core.permissions import IsAuthorOrReadOnly
+from following.feed import get_feed_keys
+from .importer import import_recipes
 from .models import Recipe
 from .serializers import RecipeCreateUpdateSerializer, RecipeSerializer
+from .utils import (RECIPES_CACHE_TAG, get_author_cache_tag,
+                    get_recipe_cache_tag)
 
 User = get_user_model()
 
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(AnonymousCacheMixin, ModelViewSet):
     """Вьюсет для модели Recipe."""
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
@@ -32,6 +40,33 @@ class RecipeViewSet(ModelViewSet):
             return (IsAuthenticated(),)
         return super().get_permissions()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve']:
+            queryset = queryset.with_related().with_user_flags(
+                self.request.user
+            )
+        return queryset
+
+    @property
+    def paginator(self):
+        """Пагинация по курсору включается параметром ?pagination=cursor."""
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = RecipeCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_cache_tags(self):
+        if self.action == 'retrieve':
+            return (get_recipe_cache_tag(self.kwargs['pk']), 'tags',
+                    'ingredients')
+        return (RECIPES_CACHE_TAG, 'tags', 'ingredients')
+
+    def get_object_cache_tags(self, instance):
+        return (get_author_cache_tag(instance.author_id),)
+
     def get_serializer_class(self):
         if self.action in ['create', 'partial_update']:
             return RecipeCreateUpdateSerializer
@@ -40,6 +75,55 @@ class RecipeViewSet(ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=(IsAuthenticated,)
+    )
+    def feed(self, request):
+        """Лента рецептов авторов, на которых подписан пользователь."""
+        paginator = KeysetPagination()
+        keys = paginator.paginate_keys(
+            lambda position, limit: get_feed_keys(
+                request.user, position, limit
+            ),
+            request
+        )
+        recipes = Recipe.objects.filter(
+            pk__in=[pk for _, pk in keys]
+        ).with_related().with_user_flags(request.user).in_bulk()
+        serializer = RecipeSerializer(
+            [recipes[pk] for _, pk in keys if pk in recipes],
+            many=True,
+            context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=(IsAuthenticated,),
+        parser_classes=(NDJSONParser, JSONParser)
+    )
+    def bulk(self, request):
+        """Массовое создание рецептов из NDJSON или JSON-массива."""
+        data = request.data
+        if isinstance(data, dict):
+            data = [data]
+        results = import_recipes(request.user, data)
+        created = sum('id' in result for result in results)
+        return Response(
+            {
+                'created': created,
+                'failed': len(results) - created,
+                'results': results
+            },
+            status=(
+                status.HTTP_201_CREATED if created
+                else status.HTTP_400_BAD_REQUEST
+            )
+        )
+
     @action(
         detail=True,
         methods=['get'],
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.utils.html import mark_safe
 
-from .models import ShoppingCart
+from .models import ShoppingCart, ShoppingListJob
 
 
 @admin.register(ShoppingCart)
@@ -31,3 +31,23 @@ class ShoppingCartAdmin(admin.ModelAdmin):
                 'style="border-radius: 50%;" />'
             )
         return None
+
+
+@admin.register(ShoppingListJob)
+class ShoppingListJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'user',
+        'format',
+        'status',
+        'created_at',
+        'finished_at'
+    )
+    list_filter = (
+        'status',
+        'format',
+    )
+    search_fields = (
+        'user__username',
+        'user__email',
+    )
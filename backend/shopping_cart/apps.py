@@ -6,3 +6,6 @@ class ShoppingCartConfig(AppConfig):
     name = 'shopping_cart'
     verbose_name = 'Список покупок'
     verbose_name_plural = 'Списки покупок'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,145 @@
+import io
+import multiprocessing
+import resource
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from core.benchmarks import percentile
+from core.constants import PDF_FONT_NAME
+from core.utils import FONT_PATH, ShoppingCartPDFGenerator
+from shopping_cart.utils import SHOPPING_LIST_RENDERERS
+
+
+def make_summary(lines):
+    return [
+        {
+            'ingredient__name': f'Ингредиент {number}',
+            'ingredient__measurement_unit': 'г',
+            'total_amount': number % 1000 + 1,
+        }
+        for number in range(lines)
+    ]
+
+
+def render_legacy(user, summary):
+    """Прежний путь: шрифт на каждый запрос и документ целиком в памяти."""
+    pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, FONT_PATH))
+    buffer = io.BytesIO()
+    ShoppingCartPDFGenerator(user, summary).write(buffer)
+    yield buffer.getvalue()
+
+
+def render_stream(user, summary):
+    return ShoppingCartPDFGenerator(user, summary).stream()
+
+
+MODES = {'legacy': render_legacy, 'stream': render_stream}
+
+
+def measure(mode, lines, repeat, connection):
+    """Замеры в отдельном процессе, чтобы пик RSS не смешивался."""
+    user = SimpleNamespace(username='benchmark')
+    summary = make_summary(lines)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    first_byte = []
+    total = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = iter(MODES[mode](user, summary))
+        next(chunks)
+        first_byte.append(time.perf_counter() - start)
+        for _ in chunks:
+            pass
+        total.append(time.perf_counter() - start)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    connection.send((first_byte, total, baseline, peak))
+    connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку и пик памяти генерации PDF списка покупок '
+        'и время CPU на запрос для каждого формата.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lines',
+            type=int,
+            nargs='+',
+            default=[10, 1000, 10000],
+            help='Количество строк в списке покупок'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Количество повторов для каждого размера'
+        )
+
+    def measure_formats(self, lines, repeat):
+        """Время CPU на один запрос для каждого рендерера."""
+        user = SimpleNamespace(username='benchmark')
+        summary = make_summary(lines)
+        result = {}
+        for renderer_class in SHOPPING_LIST_RENDERERS:
+            renderer = renderer_class()
+            for _ in renderer.stream(user, summary):
+                pass
+            start = time.process_time()
+            for _ in range(repeat):
+                for _ in renderer.stream(user, summary):
+                    pass
+            result[renderer.format] = (
+                (time.process_time() - start) / repeat
+            )
+        return result
+
+    def run_measure(self, mode, lines, repeat):
+        context = multiprocessing.get_context('fork')
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=measure, args=(mode, lines, repeat, sender)
+        )
+        process.start()
+        result = receiver.recv()
+        process.join()
+        return result
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"режим":<8}{"строк":>7}{"p50, мс":>10}{"p99, мс":>10}'
+            f'{"TTFB p50":>10}{"пик RSS, МБ":>13}{"прирост, МБ":>13}'
+        )
+        for lines in options['lines']:
+            for mode in MODES:
+                first_byte, total, baseline, peak = self.run_measure(
+                    mode, lines, options['repeat']
+                )
+                self.stdout.write(
+                    f'{mode:<8}{lines:>7}'
+                    f'{percentile(total, 0.5) * 1000:>10.1f}'
+                    f'{percentile(total, 0.99) * 1000:>10.1f}'
+                    f'{statistics.median(first_byte) * 1000:>10.1f}'
+                    f'{peak / 1024:>13.1f}'
+                    f'{(peak - baseline) / 1024:>13.1f}'
+                )
+        self.stdout.write('')
+        formats = [renderer.format for renderer in SHOPPING_LIST_RENDERERS]
+        self.stdout.write(
+            f'{"строк":>7}'
+            + ''.join(f'{f"{name}, мс CPU":>14}' for name in formats)
+        )
+        for lines in options['lines']:
+            cpu_time = self.measure_formats(lines, options['repeat'])
+            self.stdout.write(
+                f'{lines:>7}'
+                + ''.join(
+                    f'{cpu_time[name] * 1000:>14.2f}' for name in formats
+                )
+            )
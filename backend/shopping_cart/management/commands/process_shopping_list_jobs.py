@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from shopping_cart.models import ShoppingListJob
+from shopping_cart.utils import (cleanup_shopping_list_jobs,
+                                 requeue_stale_jobs, run_shopping_list_job)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет задачи генерации списков покупок из очереди, '
+        'возвращает в нее брошенные задачи и удаляет устаревшие файлы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать текущую очередь и завершиться.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Пауза между опросами очереди, в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = requeue_stale_jobs()
+            if requeued:
+                self.stdout.write(f'Возвращено в очередь: {len(requeued)}')
+            deleted = cleanup_shopping_list_jobs()
+            if deleted:
+                self.stdout.write(f'Удалено старых задач: {deleted}')
+            job_ids = list(ShoppingListJob.objects.filter(
+                status=ShoppingListJob.PENDING
+            ).values_list('id', flat=True))
+            for job_id in job_ids:
+                run_shopping_list_job(job_id)
+            if job_ids:
+                self.stdout.write(f'Обработано задач: {len(job_ids)}')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping_cart', '0004_shoppingcart_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoppinglistjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Последний запуск'),
+        ),
+    ]
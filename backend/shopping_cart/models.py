@@ -1,3 +1,5 @@
+from uuid import uuid4
+
 from django.db import models
 
 from recipes.models import Recipe, User
@@ -17,6 +19,11 @@ class ShoppingCart(models.Model):
         verbose_name='Рецепт',
         related_name='shopping_cart'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Добавлено'
+    )
 
     class Meta:
         verbose_name = 'Список покупок'
@@ -30,3 +37,76 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f'{self.user.username} - {self.recipe.name}'
+
+
+class ShoppingListJob(models.Model):
+    """Задача фоновой генерации файла со списком покупок."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid4,
+        editable=False
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+        related_name='shopping_list_jobs'
+    )
+    format = models.CharField(
+        max_length=10,
+        verbose_name='Формат'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    file = models.FileField(
+        upload_to='shopping_lists/',
+        blank=True,
+        verbose_name='Файл'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создана'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Последний запуск'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершена'
+    )
+
+    class Meta:
+        verbose_name = 'Задача списка покупок'
+        verbose_name_plural = 'Задачи списков покупок'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at'],
+                name='shopping_list_job_queue_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user.username} - {self.format} ({self.status})'
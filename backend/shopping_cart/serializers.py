@@ -1,48 +1,7 @@
 from rest_framework import serializers
 
-from .models import ShoppingCart
 from recipes.models import Recipe
-
-
-class ShoppingCartSerializer(serializers.ModelSerializer):
-    """Сериализатор для списка покупок."""
-    name = serializers.ReadOnlyField(
-        source='recipe.name'
-    )
-    image = serializers.ImageField(
-        source='recipe.image',
-        read_only=True
-    )
-    cooking_time = serializers.IntegerField(
-        source='recipe.cooking_time',
-        read_only=True
-    )
-
-    class Meta:
-        model = ShoppingCart
-        fields = (
-            'id',
-            'name',
-            'image',
-            'cooking_time'
-        )
-
-    def validate(self, data):
-        recipe = self.context['recipe']
-        if recipe.shopping_cart.filter(
-            user=self.context['request'].user
-        ).exists():
-            raise serializers.ValidationError(
-                {'detail': 'Рецепт уже в списке покупок.'}
-            )
-        return data
-
-    def create(self, validated_data):
-        shopping_cart = ShoppingCart.objects.create(
-            user=self.context['request'].user,
-            recipe=self.context['recipe']
-        )
-        return shopping_cart
+from .models import ShoppingListJob
 
 
 class RecipeShoppingCartSerializer(serializers.ModelSerializer):
@@ -56,3 +15,17 @@ class RecipeShoppingCartSerializer(serializers.ModelSerializer):
     def get_image(self, obj):
         request = self.context.get('request')
         return request.build_absolute_uri(obj.image.url) if obj.image else None
+
+
+class ShoppingListJobSerializer(serializers.ModelSerializer):
+    """Сериализатор статуса задачи генерации списка покупок."""
+    class Meta:
+        model = ShoppingListJob
+        fields = (
+            'id',
+            'format',
+            'status',
+            'error',
+            'created_at',
+            'finished_at'
+        )
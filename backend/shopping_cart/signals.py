@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.utils import update_counter
+from recipes.models import Recipe, RecipeIngredient
+from .models import ShoppingCart, ShoppingListJob
+from .utils import invalidate_recipe_shopping_carts, invalidate_shopping_carts
+
+
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def shopping_cart_changed(sender, instance, **kwargs):
+    invalidate_shopping_carts(instance.user_id)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def shopping_cart_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        update_counter(
+            Recipe.objects.filter(pk=instance.recipe_id),
+            'in_carts_count',
+            1
+        )
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def shopping_cart_deleted(sender, instance, **kwargs):
+    update_counter(
+        Recipe.objects.filter(pk=instance.recipe_id),
+        'in_carts_count',
+        -1
+    )
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def recipe_ingredient_changed(sender, instance, **kwargs):
+    invalidate_recipe_shopping_carts(instance.recipe_id)
+
+
+@receiver(post_delete, sender=ShoppingListJob)
+def shopping_list_job_deleted(sender, instance, **kwargs):
+    if instance.file:
+        instance.file.delete(save=False)
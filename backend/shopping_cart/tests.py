@@ -0,0 +1,194 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.cache import bump_version, get_version
+from core.constants import SHOPPING_LIST_JOB_TIMEOUT, SHOPPING_LIST_JOB_TTL
+from core.testing import (TEST_CACHES, UserRecipeRelationTestMixin,
+                          create_recipe, create_user)
+from core.workers import run_task
+from ingredients.models import Ingredient
+from recipes.models import RecipeIngredient
+from .models import ShoppingCart, ShoppingListJob
+from .utils import (cleanup_shopping_list_jobs, enqueue_shopping_list_job,
+                    get_cached_ingredients_summary, get_cart_cache_key,
+                    get_cart_version, requeue_stale_jobs,
+                    run_shopping_list_job)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ShoppingCartInvalidationTest(APITestCase):
+    """Версия кэша списка покупок меняется только после COMMIT."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('buyer')
+        self.recipe = create_recipe(create_user('author'))
+
+    def test_version_bumped_on_commit(self):
+        name = f'shopping_cart:{self.user.id}'
+        version = get_version(name)
+        with self.captureOnCommitCallbacks(execute=True):
+            ShoppingCart.objects.create(user=self.user, recipe=self.recipe)
+            self.assertEqual(get_version(name), version)
+        self.assertNotEqual(get_version(name), version)
+
+    def test_file_cached_under_summary_version(self):
+        RecipeIngredient.objects.create(
+            recipe=self.recipe,
+            ingredient=Ingredient.objects.create(
+                name='Мука',
+                measurement_unit='г'
+            ),
+            amount=200
+        )
+        ShoppingCart.objects.create(user=self.user, recipe=self.recipe)
+        old_version = get_cart_version(self.user.id)
+        get_summary = get_cached_ingredients_summary
+
+        def change_cart_after_summary(user, version):
+            summary = get_summary(user, version)
+            bump_version(f'shopping_cart:{user.id}')
+            return summary
+
+        self.client.force_authenticate(self.user)
+        with mock.patch(
+            'shopping_cart.views.get_cached_ingredients_summary',
+            change_cart_after_summary
+        ):
+            response = self.client.get('/api/recipes/download_shopping_cart/')
+            b''.join(response.streaming_content)
+        new_version = get_cart_version(self.user.id)
+        self.assertNotEqual(new_version, old_version)
+        self.assertIsNotNone(
+            cache.get(get_cart_cache_key(self.user.id, old_version, 'pdf'))
+        )
+        self.assertIsNone(
+            cache.get(get_cart_cache_key(self.user.id, new_version, 'pdf'))
+        )
+
+
+class ShoppingCartRelationTest(UserRecipeRelationTestMixin, APITestCase):
+    """Добавление и удаление из списка покупок — фиксированное число SQL."""
+    model = ShoppingCart
+    url_name = 'shopping_cart'
+    counter_field = 'in_carts_count'
+    queries = {
+        'add': 5,
+        'add_existing': 5,
+        'remove': 3,
+        'remove_missing': 2,
+        'add_unknown': 1,
+        'remove_unknown': 2,
+    }
+
+
+@override_settings(BACKGROUND_WORKERS=0, CACHES=TEST_CACHES)
+class ShoppingListJobTest(APITestCase):
+    """Фоновая генерация списка покупок с выполнением в этом процессе."""
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        self.user = create_user('buyer')
+        recipe = create_recipe(create_user('author'))
+        RecipeIngredient.objects.create(
+            recipe=recipe,
+            ingredient=Ingredient.objects.create(
+                name='Мука',
+                measurement_unit='г'
+            ),
+            amount=200
+        )
+        ShoppingCart.objects.create(user=self.user, recipe=recipe)
+        self.client.force_authenticate(self.user)
+
+    def get_job(self, job):
+        return self.client.get(
+            f'/api/recipes/download_shopping_cart/{job.id}/'
+        )
+
+    def test_pending_job_done(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/recipes/download_shopping_cart/?format=txt'
+            )
+        self.assertEqual(response.status_code, 202)
+        job = ShoppingListJob.objects.get(pk=response.json()['id'])
+        self.assertEqual(job.status, ShoppingListJob.PENDING)
+        self.assertEqual(self.get_job(job).status_code, 202)
+        run_shopping_list_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ShoppingListJob.DONE)
+        response = self.get_job(job)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Мука - 200', b''.join(
+            response.streaming_content
+        ).decode())
+
+    def test_failed_job(self):
+        job = enqueue_shopping_list_job(self.user, 'doc')
+        with self.assertLogs('shopping_cart.utils', 'ERROR'):
+            run_shopping_list_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ShoppingListJob.FAILED)
+        response = self.get_job(job)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], ShoppingListJob.FAILED)
+
+    def test_other_user_gets_404(self):
+        job = enqueue_shopping_list_job(self.user, 'txt')
+        self.client.force_authenticate(create_user('stranger'))
+        self.assertEqual(self.get_job(job).status_code, 404)
+
+    def test_stale_running_job_requeued(self):
+        job = enqueue_shopping_list_job(self.user, 'txt')
+        past = timezone.now() - timedelta(
+            seconds=SHOPPING_LIST_JOB_TIMEOUT + 1
+        )
+        ShoppingListJob.objects.filter(pk=job.pk).update(
+            status=ShoppingListJob.RUNNING,
+            created_at=past,
+            started_at=past
+        )
+        self.assertEqual(requeue_stale_jobs(), [job.pk])
+        self.assertEqual(requeue_stale_jobs(), [])
+        run_shopping_list_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ShoppingListJob.DONE)
+
+    def test_cleanup_removes_old_files(self):
+        job = enqueue_shopping_list_job(self.user, 'txt')
+        run_shopping_list_job(job.id)
+        job.refresh_from_db()
+        storage, name = job.file.storage, job.file.name
+        self.assertTrue(storage.exists(name))
+        ShoppingListJob.objects.filter(pk=job.pk).update(
+            finished_at=timezone.now() - timedelta(
+                seconds=SHOPPING_LIST_JOB_TTL + 1
+            )
+        )
+        self.assertEqual(cleanup_shopping_list_jobs(), 1)
+        self.assertFalse(storage.exists(name))
+
+
+class RunTaskTest(APITestCase):
+    """Ошибки фоновых задач попадают в лог."""
+
+    def test_exception_logged(self):
+        def broken():
+            raise ValueError('сбой')
+
+        with self.assertLogs('core.workers', 'ERROR'):
+            with self.assertRaises(ValueError):
+                run_task(broken)
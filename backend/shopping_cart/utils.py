@@ -0,0 +1,205 @@
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from core.cache import bump_version, get_version, stream_with_cache
+from core.constants import (SHOPPING_CART_CACHE_MAX_SIZE,
+                            SHOPPING_CART_CACHE_TIMEOUT,
+                            SHOPPING_LIST_JOB_TIMEOUT, SHOPPING_LIST_JOB_TTL,
+                            SPOOL_MAX_SIZE)
+from core.relations import UserRecipeRelation
+from core.renderers import (CSVShoppingListRenderer,
+                            JSONShoppingListRenderer,
+                            PDFShoppingListRenderer,
+                            TextShoppingListRenderer)
+from core.workers import submit
+from recipes.models import RecipeIngredient
+from .models import ShoppingCart, ShoppingListJob
+
+logger = logging.getLogger(__name__)
+
+shopping_cart_relation = UserRecipeRelation(
+    ShoppingCart,
+    'in_carts_count',
+    exists_message='Рецепт уже в списке покупок.',
+    missing_message='Рецепт не найден в списке покупок.',
+    on_bulk_change=lambda user_id: invalidate_shopping_carts(user_id)
+)
+
+SHOPPING_LIST_RENDERERS = (
+    PDFShoppingListRenderer,
+    TextShoppingListRenderer,
+    CSVShoppingListRenderer,
+    JSONShoppingListRenderer,
+)
+
+
+def get_ingredients_summary(user):
+    """Суммирует ингредиенты всех рецептов из списка покупок."""
+    return (
+        RecipeIngredient.objects
+        .filter(recipe__shopping_cart__user=user)
+        .values('ingredient__name', 'ingredient__measurement_unit')
+        .annotate(total_amount=Sum('amount'))
+        .order_by('ingredient__name')
+    )
+
+
+def get_cart_version(user_id):
+    return get_version(f'shopping_cart:{user_id}')
+
+
+def get_cart_cache_key(user_id, version, suffix):
+    """Ключ кэша, привязанный к версии списка покупок.
+
+    Версию читают один раз за запрос и передают во все ключи: иначе
+    файл, собранный из сводки старой версии, попадет под ключ новой.
+    """
+    return f'shopping_cart:{user_id}:{version}:{suffix}'
+
+
+def get_cached_ingredients_summary(user, version):
+    """Сводка ингредиентов из кэша или из базы данных."""
+    key = get_cart_cache_key(user.id, version, 'summary')
+    ingredients_summary = cache.get(key)
+    if ingredients_summary is None:
+        ingredients_summary = list(get_ingredients_summary(user))
+        cache.set(key, ingredients_summary, SHOPPING_CART_CACHE_TIMEOUT)
+    return ingredients_summary
+
+
+def invalidate_shopping_carts(*user_ids):
+    """Сбрасывает кэш списков покупок пользователей после фиксации.
+
+    Если сменить версию до COMMIT, параллельное скачивание успеет
+    положить в кэш старый список уже под новой версией.
+    """
+    names = tuple(f'shopping_cart:{user_id}' for user_id in user_ids)
+    transaction.on_commit(lambda: bump_version(*names))
+
+
+def invalidate_recipe_shopping_carts(recipe_id):
+    """Сбрасывает кэш у всех, чей список покупок содержит рецепт."""
+    invalidate_shopping_carts(*ShoppingCart.objects.filter(
+        recipe_id=recipe_id
+    ).values_list('user_id', flat=True))
+
+
+def render_shopping_list(user, renderer, version=None,
+                         ingredients_summary=None):
+    """Отдает файл списка покупок частями, используя кэш версии корзины."""
+    if version is None:
+        version = get_cart_version(user.id)
+    if ingredients_summary is None:
+        ingredients_summary = get_cached_ingredients_summary(user, version)
+    content = renderer.stream(user, ingredients_summary)
+    if renderer.cacheable:
+        content = stream_with_cache(
+            get_cart_cache_key(user.id, version, renderer.format),
+            content,
+            SHOPPING_CART_CACHE_TIMEOUT,
+            SHOPPING_CART_CACHE_MAX_SIZE
+        )
+    return content
+
+
+def get_renderer(format):
+    for renderer_class in SHOPPING_LIST_RENDERERS:
+        if renderer_class.format == format:
+            return renderer_class()
+    raise ValueError(f'Неизвестный формат списка покупок: {format}')
+
+
+def claim_job(job_id):
+    """Помечает задачу выполняемой, если ее еще никто не взял."""
+    return ShoppingListJob.objects.filter(
+        pk=job_id,
+        status=ShoppingListJob.PENDING
+    ).update(status=ShoppingListJob.RUNNING, started_at=timezone.now())
+
+
+def get_stale_jobs():
+    """Задачи, брошенные упавшим процессом.
+
+    Выполняемые или ожидающие дольше SHOPPING_LIST_JOB_TIMEOUT с момента
+    создания или последнего запуска: передача задачи в пул могла
+    потеряться вместе с процессом.
+    """
+    threshold = timezone.now() - timedelta(seconds=SHOPPING_LIST_JOB_TIMEOUT)
+    return ShoppingListJob.objects.filter(
+        Q(started_at__isnull=True) | Q(started_at__lt=threshold),
+        status__in=(ShoppingListJob.PENDING, ShoppingListJob.RUNNING),
+        created_at__lt=threshold
+    )
+
+
+def requeue_stale_jobs(queryset=None):
+    """Возвращает брошенные задачи в очередь; отдает их id."""
+    if queryset is None:
+        queryset = ShoppingListJob.objects.all()
+    job_ids = list(queryset.filter(
+        pk__in=get_stale_jobs().values('pk')
+    ).values_list('pk', flat=True))
+    if job_ids:
+        ShoppingListJob.objects.filter(pk__in=job_ids).update(
+            status=ShoppingListJob.PENDING,
+            started_at=timezone.now()
+        )
+    return job_ids
+
+
+def cleanup_shopping_list_jobs():
+    """Удаляет завершенные задачи старше SHOPPING_LIST_JOB_TTL с файлами."""
+    threshold = timezone.now() - timedelta(seconds=SHOPPING_LIST_JOB_TTL)
+    jobs = ShoppingListJob.objects.filter(
+        status__in=(ShoppingListJob.DONE, ShoppingListJob.FAILED),
+        finished_at__lt=threshold
+    )
+    deleted = 0
+    for job in jobs.iterator():
+        job.delete()
+        deleted += 1
+    return deleted
+
+
+def run_shopping_list_job(job_id):
+    """Генерирует файл для задачи и сохраняет его в MEDIA_ROOT."""
+    if not claim_job(job_id):
+        return
+    job = ShoppingListJob.objects.select_related('user').get(pk=job_id)
+    try:
+        renderer = get_renderer(job.format)
+        with tempfile.SpooledTemporaryFile(
+            max_size=SPOOL_MAX_SIZE
+        ) as output:
+            for chunk in render_shopping_list(job.user, renderer):
+                output.write(chunk)
+            output.seek(0)
+            job.file.save(
+                f'{job.id}.{renderer.format}',
+                File(output),
+                save=False
+            )
+        job.status = ShoppingListJob.DONE
+    except Exception as error:
+        logger.exception('Не удалось сформировать список покупок %s', job.id)
+        job.status = ShoppingListJob.FAILED
+        job.error = str(error)
+    job.finished_at = timezone.now()
+    job.save(update_fields=('file', 'status', 'error', 'finished_at'))
+
+
+def enqueue_shopping_list_job(user, format):
+    """Создает задачу и передает ее пулу потоков, если он включен.
+
+    Без пула задачи выполняет команда process_shopping_list_jobs.
+    """
+    job = ShoppingListJob.objects.create(user=user, format=format)
+    transaction.on_commit(lambda: submit(run_shopping_list_job, job.id))
+    return job
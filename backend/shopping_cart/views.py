@@ -1,15 +1,19 @@
-from django.db.models import Sum
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.http import HttpResponse
 
-from core.utils import ShoppingCartPDFGenerator
-from recipes.models import Recipe, RecipeIngredient
-from .models import ShoppingCart
-from .serializers import ShoppingCartSerializer, RecipeShoppingCartSerializer
+from core.workers import submit
+from .models import ShoppingListJob
+from .serializers import (RecipeShoppingCartSerializer,
+                          ShoppingListJobSerializer)
+from .utils import (SHOPPING_LIST_RENDERERS, enqueue_shopping_list_job,
+                    get_cached_ingredients_summary, get_cart_version,
+                    render_shopping_list, requeue_stale_jobs,
+                    run_shopping_list_job, shopping_cart_relation)
 
 
 class ShoppingCartView(APIView):
@@ -17,17 +21,9 @@ class ShoppingCartView(APIView):
     permission_classes = (IsAuthenticated,)
 
     def post(self, request, pk=None):
-        serializer = ShoppingCartSerializer(
-            data=request.data,
-            context={
-                'request': request,
-                'recipe': get_object_or_404(Recipe, pk=pk)
-            }
-        )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        shopping_cart = shopping_cart_relation.add(request.user, pk)
         response_serializer = RecipeShoppingCartSerializer(
-            get_object_or_404(Recipe, pk=pk),
+            shopping_cart.recipe,
             context={'request': request}
         )
         return Response(
@@ -36,45 +32,90 @@ class ShoppingCartView(APIView):
         )
 
     def delete(self, request, pk=None):
-        shopping_cart = get_object_or_404(Recipe, pk=pk).shopping_cart.filter(
-            user=request.user
-        )
-        if not shopping_cart.exists():
-            return Response(
-                {'detail': 'Рецепт не найден в списке покупок.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        shopping_cart.delete()
+        shopping_cart_relation.remove(request.user, pk)
         return Response(
             {'detail': 'Рецепт успешно удален из списка покупок.'},
             status=status.HTTP_204_NO_CONTENT
         )
 
 
-class DownloadShoppingCartView(APIView):
+class ShoppingListResponseMixin:
+    """Ответы с ошибками и статусами всегда отдаются в JSON."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if isinstance(response, Response):
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class DownloadShoppingCartView(ShoppingListResponseMixin, APIView):
     """APIView для скачивания списка покупок."""
     permission_classes = (IsAuthenticated,)
+    renderer_classes = SHOPPING_LIST_RENDERERS
 
     def get(self, request):
-        """Скачать список покупок."""
-        if not ShoppingCart.objects.filter(user=request.user).exists():
+        """Скачать список покупок в формате PDF, TXT, CSV или JSON."""
+        version = get_cart_version(request.user.id)
+        ingredients_summary = get_cached_ingredients_summary(
+            request.user, version
+        )
+        if not ingredients_summary:
             return Response(
                 {'detail': 'Список покупок пуст.'},
                 status=200
             )
-        ingredients_summary = (
-            RecipeIngredient.objects
-            .filter(recipe__shopping_cart__user=request.user)
-            .values('ingredient__name', 'ingredient__measurement_unit')
-            .annotate(total_amount=Sum('amount'))
-        )
-        pdf_generator = ShoppingCartPDFGenerator(
-            request.user,
-            ingredients_summary
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            render_shopping_list(
+                request.user, renderer, version, ingredients_summary
+            ),
+            content_type=renderer.get_content_type()
         )
-        pdf_data = pdf_generator.generate()
-        response = HttpResponse(pdf_data, content_type='application/pdf')
         response['Content-Disposition'] = (
-            'attachment; filename="shopping_cart.pdf"'
+            f'attachment; filename="{renderer.get_filename()}"'
         )
         return response
+
+    def post(self, request):
+        """Поставить генерацию списка покупок в очередь."""
+        if not get_cached_ingredients_summary(
+            request.user, get_cart_version(request.user.id)
+        ):
+            return Response(
+                {'detail': 'Список покупок пуст.'},
+                status=200
+            )
+        job = enqueue_shopping_list_job(
+            request.user,
+            request.accepted_renderer.format
+        )
+        return Response(
+            ShoppingListJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class ShoppingListJobView(ShoppingListResponseMixin, APIView):
+    """APIView для статуса задачи и скачивания готового файла."""
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, job_id):
+        jobs = ShoppingListJob.objects.filter(user=request.user)
+        job = get_object_or_404(jobs, pk=job_id)
+        if requeue_stale_jobs(jobs.filter(pk=job.pk)):
+            job.refresh_from_db()
+            submit(run_shopping_list_job, job.pk)
+        if job.status != ShoppingListJob.DONE:
+            return Response(
+                ShoppingListJobSerializer(job).data,
+                status=(
+                    status.HTTP_200_OK if job.status == ShoppingListJob.FAILED
+                    else status.HTTP_202_ACCEPTED
+                )
+            )
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=f'shopping_cart.{job.format}'
+        )
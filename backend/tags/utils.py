@@ -0,0 +1,27 @@
+from django.core.cache import cache
+
+from core.cache import get_version
+from core.constants import REFERENCE_CACHE_TIMEOUT
+from core.reference import ReferenceIndex
+from .models import Tag
+
+tag_index = ReferenceIndex(Tag, 'tags')
+
+
+def get_tag_lookup():
+    """Словарь {slug или name: id} всех тегов из кэша текущей версии."""
+    key = f'tags:lookup:{get_version("tags")}'
+    lookup = cache.get(key)
+    if lookup is None:
+        lookup = {}
+        for pk, name, slug in Tag.objects.values_list('id', 'name', 'slug'):
+            lookup[name] = pk
+            lookup[slug] = pk
+        cache.set(key, lookup, REFERENCE_CACHE_TIMEOUT)
+    return lookup
+
+
+def get_tag_ids(values):
+    """Id тегов по списку слагов или названий."""
+    lookup = get_tag_lookup()
+    return {lookup[value] for value in values if value in lookup}
@@ -1,12 +1,14 @@
 from rest_framework.permissions import AllowAny
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from core.mixins import CachedListMixin
 from .models import Tag
 from .serializers import TagSerializer
 
 
-class TagsViewSet(ReadOnlyModelViewSet):
+class TagsViewSet(CachedListMixin, ReadOnlyModelViewSet):
     """Вьюсет для модели Tag."""
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AllowAny,)
+    cache_version_name = 'tags'
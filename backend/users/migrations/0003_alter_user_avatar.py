@@ -0,0 +1,19 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:07
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_followers_count_user_recipes_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(blank=True, default=None, null=True, storage=core.storage.ContentAddressedStorage(), upload_to='users/images/'),
+        ),
+    ]
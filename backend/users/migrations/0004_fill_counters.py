@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total'),
+        output_field=IntegerField()
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    user = apps.get_model('users', 'User')
+    recipe = apps.get_model('recipes', 'Recipe')
+    follow = apps.get_model('following', 'Follow')
+    user.objects.update(
+        recipes_count=count_of(recipe, 'author'),
+        followers_count=count_of(follow, 'following')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_user_avatar'),
+        ('recipes', '0002_initial'),
+        ('following', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
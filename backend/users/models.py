@@ -2,6 +2,7 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 from core.constants import MAX_LENGTH_FIRST_AND_LAST_NAME, MAX_LENGTH_USERNAME
+from core.storage import image_storage
 from core.validators import CustomUsernameValidator
 
 
@@ -21,10 +22,19 @@ class User(AbstractUser):
     )
     avatar = models.ImageField(
         upload_to='users/images/',
+        storage=image_storage,
         null=True,
         blank=True,
         default=None
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество рецептов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков'
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
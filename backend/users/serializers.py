@@ -3,7 +3,7 @@ from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 
 from core.constants import NON_VALID_USERNAME
-from core.fields import Base64ImageField
+from core.fields import Base64ImageField, ImageVariantsField
 
 User = get_user_model()
 
@@ -58,6 +58,7 @@ class AvatarSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     """Сериализатор объекта user."""
     is_subscribed = serializers.SerializerMethodField()
+    avatar_variants = ImageVariantsField(source='avatar')
 
     class Meta:
         model = User
@@ -68,10 +69,13 @@ class UserSerializer(serializers.ModelSerializer):
             'last_name',
             'email',
             'avatar',
+            'avatar_variants',
             'is_subscribed',
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context.get('request')
         return (
             request and request.user.is_authenticated
@@ -121,3 +125,10 @@ class SetPasswordSerializer(serializers.Serializer):
         user.set_password(self.validated_data['new_password'])
         user.save()
         return user
+
+
+class SyncOperationSerializer(serializers.Serializer):
+    """Одна операция синхронизации избранного и списка покупок."""
+    op = serializers.ChoiceField(choices=('add', 'remove'))
+    kind = serializers.ChoiceField(choices=('favorite', 'shopping_cart'))
+    recipe_id = serializers.IntegerField(min_value=1)
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.images import (release_replaced_image, remember_image,
+                         schedule_release, schedule_variants)
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=User)
+def user_loaded(sender, instance, **kwargs):
+    remember_image(instance, 'avatar')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    release_replaced_image(instance, 'avatar')
+    schedule_variants(instance.avatar)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    schedule_release(instance.avatar.name)
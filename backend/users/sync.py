@@ -0,0 +1,47 @@
+from django.db import transaction
+
+from favorite.utils import favorite_relation
+from recipes.models import Recipe
+from shopping_cart.utils import shopping_cart_relation
+
+RELATIONS = {
+    'favorite': favorite_relation,
+    'shopping_cart': shopping_cart_relation,
+}
+
+
+def sync_user_recipes(user, operations):
+    """Применяет накопленные офлайн операции одной транзакцией.
+
+    Для каждой пары (kind, recipe_id) действует последняя операция.
+    Возвращает состояние затронутых рецептов и id ненайденных рецептов.
+    """
+    final = {}
+    for operation in operations:
+        final[(operation['kind'], operation['recipe_id'])] = operation['op']
+    recipe_ids = {recipe_id for _, recipe_id in final}
+    existing = set(Recipe.objects.filter(
+        pk__in=recipe_ids
+    ).values_list('id', flat=True))
+    with transaction.atomic():
+        for kind, relation in RELATIONS.items():
+            relation.apply(
+                user,
+                add_ids=[
+                    recipe_id for (op_kind, recipe_id), op in final.items()
+                    if op_kind == kind and op == 'add'
+                    and recipe_id in existing
+                ],
+                remove_ids=[
+                    recipe_id for (op_kind, recipe_id), op in final.items()
+                    if op_kind == kind and op == 'remove'
+                    and recipe_id in existing
+                ]
+            )
+    state = Recipe.objects.filter(pk__in=existing).with_user_flags(
+        user
+    ).order_by('id').values('id', 'is_favorited', 'is_in_shopping_cart')
+    return {
+        'recipes': list(state),
+        'not_found': sorted(recipe_ids - existing),
+    }
@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from core.constants import SYNC_MAX_OPERATIONS
+from core.testing import TEST_CACHES, create_recipe, create_user
+from favorite.models import Favorite
+from ingredients.models import Ingredient
+from recipes.models import RecipeIngredient
+from shopping_cart.models import ShoppingCart
+from shopping_cart.utils import (get_cached_ingredients_summary,
+                                 get_cart_version)
+
+SYNC_URL = '/api/users/me/sync/'
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SyncTest(APITestCase):
+    """Офлайн-синхронизация избранного и списка покупок."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('reader')
+        author = create_user('author')
+        self.first = create_recipe(author, 'Первый')
+        self.second = create_recipe(author, 'Второй')
+        self.client.force_authenticate(self.user)
+
+    def sync(self, *operations):
+        return self.client.post(
+            SYNC_URL,
+            [
+                {'op': op, 'kind': kind, 'recipe_id': recipe_id}
+                for op, kind, recipe_id in operations
+            ],
+            format='json'
+        )
+
+    def assert_counters(self, recipe, favorites, in_carts):
+        recipe.refresh_from_db()
+        self.assertEqual(
+            (recipe.favorites_count, recipe.in_carts_count),
+            (favorites, in_carts)
+        )
+
+    def test_state_and_counters(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.second)
+        unknown = self.second.pk + 1
+        response = self.sync(
+            ('add', 'favorite', self.first.pk),
+            ('add', 'shopping_cart', self.first.pk),
+            ('add', 'favorite', self.second.pk),
+            ('remove', 'favorite', self.second.pk),
+            ('remove', 'shopping_cart', self.second.pk),
+            ('add', 'favorite', unknown),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'recipes': [
+                {
+                    'id': self.first.pk,
+                    'is_favorited': True,
+                    'is_in_shopping_cart': True,
+                },
+                {
+                    'id': self.second.pk,
+                    'is_favorited': False,
+                    'is_in_shopping_cart': False,
+                },
+            ],
+            'not_found': [unknown],
+        })
+        self.assert_counters(self.first, 1, 1)
+        self.assert_counters(self.second, 0, 0)
+        self.assertFalse(Favorite.objects.filter(recipe=self.second).exists())
+
+    def test_repeated_sync_keeps_counters(self):
+        operations = (
+            ('add', 'favorite', self.first.pk),
+            ('add', 'shopping_cart', self.first.pk),
+        )
+        self.sync(*operations)
+        self.assertEqual(self.sync(*operations).status_code, 200)
+        self.assert_counters(self.first, 1, 1)
+
+    def test_remove_invalidates_cart_cache(self):
+        RecipeIngredient.objects.create(
+            recipe=self.first,
+            ingredient=Ingredient.objects.create(
+                name='Мука',
+                measurement_unit='г'
+            ),
+            amount=200
+        )
+        ShoppingCart.objects.create(user=self.user, recipe=self.first)
+        version = get_cart_version(self.user.id)
+        self.assertEqual(
+            len(get_cached_ingredients_summary(self.user, version)), 1
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sync(('remove', 'shopping_cart', self.first.pk))
+        version = get_cart_version(self.user.id)
+        self.assertEqual(
+            get_cached_ingredients_summary(self.user, version), []
+        )
+
+    def test_invalid_payloads(self):
+        operation = {
+            'op': 'add', 'kind': 'favorite', 'recipe_id': self.first.pk
+        }
+        payloads = (
+            operation,
+            [{**operation, 'op': 'toggle'}],
+            [{**operation, 'kind': 'likes'}],
+            [{**operation, 'recipe_id': 0}],
+            [{'op': 'add', 'kind': 'favorite'}],
+            [operation] * (SYNC_MAX_OPERATIONS + 1),
+        )
+        for payload in payloads:
+            with self.subTest(payload=str(payload)[:60]):
+                response = self.client.post(SYNC_URL, payload, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Favorite.objects.exists())
+        self.assert_counters(self.first, 0, 0)
+
+    def test_anonymous(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            self.sync(('add', 'favorite', self.first.pk)).status_code, 401
+        )
@@ -1,16 +1,22 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import BooleanField, Value
 from django.shortcuts import get_object_or_404
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from core.constants import SYNC_MAX_OPERATIONS
 from core.mixins import UpdateModelMixin
 from core.paginators import CustomPagination
 from core.permissions import IsAuthorOrReadOnly
+from following.feed import remove_author_from_feed
 from following.serializers import FollowSerializer, FollowCreateSerializer
 from .serializers import (AvatarSerializer, SetPasswordSerializer,
-                          UserRegistrationSerializer, UserSerializer)
+                          SyncOperationSerializer, UserRegistrationSerializer,
+                          UserSerializer)
+from .sync import sync_user_recipes
 
 User = get_user_model()
 
@@ -96,6 +102,25 @@ class UserViewSet(
             status=status.HTTP_204_NO_CONTENT
         )
 
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=(IsAuthenticated,),
+        url_path='me/sync'
+    )
+    def sync(self, request):
+        """Применить пачку операций с избранным и списком покупок."""
+        serializer = SyncOperationSerializer(
+            data=request.data,
+            many=True,
+            max_length=SYNC_MAX_OPERATIONS
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            sync_user_recipes(request.user, serializer.validated_data),
+            status=status.HTTP_200_OK
+        )
+
     @action(
         detail=True,
         methods=['post'],
@@ -116,15 +141,18 @@ class UserViewSet(
 
     @subscribe.mapping.delete
     def unsubscribe(self, request, pk=None):
-        follow = request.user.following.filter(
-            following=get_object_or_404(User, pk=pk)
-        )
-        if not follow.exists():
+        following = get_object_or_404(User, pk=pk)
+        with transaction.atomic():
+            deleted, _ = request.user.following.filter(
+                following=following
+            ).delete()
+            if deleted:
+                remove_author_from_feed(request.user, following)
+        if not deleted:
             return Response(
                 {'detail': 'Вы не подписаны на этого пользователя.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        follow.delete()
         return Response(
             {'detail': 'Вы отписались от пользователя.'},
             status=status.HTTP_204_NO_CONTENT,
@@ -137,8 +165,11 @@ class UserViewSet(
         url_path='subscriptions'
     )
     def subscriptions(self, request):
-        subscriptions = request.user.following.all()
-        followed_users = [follow.following for follow in subscriptions]
+        followed_users = User.objects.filter(
+            who_follows__user=request.user
+        ).annotate(
+            is_subscribed=Value(True, output_field=BooleanField())
+        ).order_by('who_follows__id')
         page = self.paginate_queryset(followed_users)
         serializer = FollowSerializer(
             page if page is not None else followed_users,